@@ -6,13 +6,14 @@ os.makedirs("logs", exist_ok=True)
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks,Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 import asyncio
 import json
+import time
 from pathlib import Path
 from dotenv import load_dotenv  # correct import for loading .env files
 
@@ -38,6 +39,13 @@ try:
     from services.maps_service import MapsService
     from services.emergency_routing import EmergencyRouter
     from services.monitoring_service import MonitoringService
+    from services.gemini_client import gemini_client
+    from services.incident_coalescer import IncidentCoalescer
+    from services.incident_jobs import IncidentJobRunner
+    from services.incident_scheduler import IncidentScheduler, incident_priority
+    from services.rate_limiter import gemini_rate_limiter
+    from services.report_renderer import ReportRenderQueue
+    from services.summary_aggregator import SummaryAggregator
     from utils.config import settings
     print("✅ All modules loaded successfully")
 except ImportError as e:
@@ -78,6 +86,23 @@ multi_agent_manager = MultiAgentIncidentManager()
 maps_service = MapsService()
 emergency_router = EmergencyRouter()
 monitoring_service = MonitoringService()
+incident_coalescer = IncidentCoalescer(
+    window_seconds=settings.incident_coalesce_window_seconds,
+    max_keys=settings.incident_coalesce_max_keys
+) if settings.incident_coalesce_enabled else None
+incident_scheduler = IncidentScheduler(
+    max_concurrent=settings.incident_analysis_max_concurrent,
+    aging_seconds=settings.incident_scheduler_aging_seconds
+)
+incident_jobs = IncidentJobRunner(max_pending=settings.incident_queue_size)
+report_queue = ReportRenderQueue(
+    reports_dir=settings.report_dir,
+    max_workers=settings.report_render_workers,
+    timeout_seconds=settings.report_render_timeout_seconds,
+    max_items=settings.report_max_items,
+    max_summary_chars=settings.report_max_summary_chars,
+    max_jobs=settings.report_max_jobs
+)
 
 # Global state for real-time data
 monitoring_data = {
@@ -94,6 +119,15 @@ async def startup_event():
     await monitoring_service.start_monitoring()
     print("🚀 Public Safety Monitoring System started successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker pools on shutdown"""
+    video_processor.close()
+    report_queue.close()
+    incident_jobs.close()
+    gemini_client.close()
+    await monitoring_service.stop_monitoring()
+
 @app.get("/", response_class=HTMLResponse)
 async def dashboard():
     """Main dashboard page"""
@@ -214,6 +248,14 @@ async def get_camera_feeds():
         "last_updated": datetime.now().isoformat()
     }
 
+@app.get("/api/monitoring/streams")
+async def get_stream_status():
+    """Get live stream ingestion status per camera"""
+    return {
+        "streams": await monitoring_service.get_stream_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @app.get("/api/monitoring/live")
 async def get_live_monitoring():
     """Get live monitoring data"""
@@ -230,40 +272,205 @@ async def get_live_monitoring():
 async def analyze_drone_footage(
     background_tasks: BackgroundTasks,
     video_url: str = None,
-    video_file: UploadFile = File(None)
+    video_file: UploadFile = File(None),
+    save_frames: bool = False,
+    streaming: bool = False
 ):
     """Analyze drone footage for anomalies"""
     try:
-        if video_url:
+        analysis_result = None
+        aggregator = SummaryAggregator()
+        # Per-stage wall times; when streaming, decoding overlaps analysis and is counted there
+        timings = {}
+        request_started = stage_started = time.perf_counter()
+        if video_url and streaming:
+            # Decode and analyze frames while the video is still downloading
+            stream_stats = {}
+            frame_stream = video_processor.stream_frames(
+                video_url, stats=stream_stats, frame_seconds=ai_analyzer.estimated_frame_seconds()
+            )
+            analysis_result = []
+            async for frame_result in ai_analyzer.analyze_frame_stream(frame_stream):
+                aggregator.add(frame_result)
+                analysis_result.append(frame_result)
+            analysis_result.sort(key=lambda frame_result: frame_result["frame_index"])
+            result = {
+                "frames": analysis_result,
+                "duplicate_frames_skipped": stream_stats.get("duplicate_frames_skipped", 0),
+                "sampling_plan": stream_stats.get("sampling_plan")
+            }
+        elif video_url:
             # Process YouTube video
-            result = await video_processor.process_youtube_video(video_url)
+            result = await video_processor.process_youtube_video(
+                video_url, save_frames=save_frames, frame_seconds=ai_analyzer.estimated_frame_seconds()
+            )
         elif video_file:
             # Process uploaded video file
-            result = await video_processor.process_uploaded_video(video_file)
+            result = await video_processor.process_uploaded_video(
+                video_file, save_frames=save_frames, frame_seconds=ai_analyzer.estimated_frame_seconds()
+            )
         else:
             raise HTTPException(status_code=400, detail="No video source provided")
         
         # Analyze frames with AI
-        analysis_result = await ai_analyzer.analyze_frames(result["frames"])
-        summary = await ai_analyzer.generate_summary(analysis_result)
+        if analysis_result is None:
+            timings["frames_seconds"] = round(time.perf_counter() - stage_started, 4)
+            stage_started = time.perf_counter()
+            analysis_result = []
+            async for frame_result in ai_analyzer.analyze_frames_as_completed(result["frames"]):
+                aggregator.add(frame_result)
+                analysis_result.append(frame_result)
+            analysis_result.sort(key=lambda frame_result: frame_result["frame_index"])
+        timings["analysis_seconds"] = round(time.perf_counter() - stage_started, 4)
+        stage_started = time.perf_counter()
 
-        pdf_path = ai_analyzer.save_summary_to_pdf(summary, output_path="temp/final_report.pdf")
-        print(f"Saved PDF summary to {pdf_path}")
         # Generate summary
-        summary = await ai_analyzer.generate_summary(analysis_result)
+        summary = await ai_analyzer.generate_summary(aggregator=aggregator)
+        timings["summary_seconds"] = round(time.perf_counter() - stage_started, 4)
+
+        # Render the PDF in the background; the client fetches it from the report URLs
+        report = report_queue.submit(summary)
+        timings["total_seconds"] = round(time.perf_counter() - request_started, 4)
         
         return {
             "status": "success",
             "analysis": analysis_result,
             "summary": summary,
+            "report": report,
             "processed_frames": len(result["frames"]),
+            "duplicate_frames_skipped": result.get("duplicate_frames_skipped", 0),
+            "sampling_plan": result.get("sampling_plan"),
+            "prefiltered_frames": len([a for a in analysis_result if a.get("prefiltered")]),
             "anomalies_detected": len([a for a in analysis_result if a.get("anomaly_detected")]),
+            "timings": timings,
             "timestamp": datetime.now().isoformat()
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
+@app.post("/api/drone/analyze/stream")
+async def stream_drone_analysis(
+    video_url: str = None,
+    video_file: UploadFile = File(None),
+    streaming: bool = False,
+    format: str = "sse"
+):
+    """Analyze drone footage, emitting each frame result as soon as it is ready.
+
+    Sends `frame` events as frames complete, then `summary`, `report` (PDF status and link)
+    and `done`, as server-sent events or, with format=ndjson, one JSON object per line.
+    """
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'sse' or 'ndjson'")
+    if not video_url and not video_file:
+        raise HTTPException(status_code=400, detail="No video source provided")
+
+    prepared = None
+    if video_file and not video_url:
+        # The upload is only readable while the request handler runs
+        try:
+            prepared = await video_processor.process_uploaded_video(
+                video_file, frame_seconds=ai_analyzer.estimated_frame_seconds()
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+
+    async def events():
+        try:
+            analysis_result = []
+            aggregator = SummaryAggregator()
+            if prepared is None and streaming:
+                stream_stats = {}
+                frame_stream = video_processor.stream_frames(
+                    video_url, stats=stream_stats, frame_seconds=ai_analyzer.estimated_frame_seconds()
+                )
+                async for frame_result in ai_analyzer.analyze_frame_stream(frame_stream):
+                    aggregator.add(frame_result)
+                    analysis_result.append(frame_result)
+                    yield "frame", frame_result
+                result = {
+                    "frames": analysis_result,
+                    "duplicate_frames_skipped": stream_stats.get("duplicate_frames_skipped", 0),
+                    "sampling_plan": stream_stats.get("sampling_plan")
+                }
+            else:
+                result = prepared or await video_processor.process_youtube_video(
+                    video_url, frame_seconds=ai_analyzer.estimated_frame_seconds()
+                )
+                yield "frames", {
+                    "processed_frames": len(result["frames"]),
+                    "duplicate_frames_skipped": result.get("duplicate_frames_skipped", 0),
+                    "sampling_plan": result.get("sampling_plan")
+                }
+                async for frame_result in ai_analyzer.analyze_frames_as_completed(result["frames"]):
+                    aggregator.add(frame_result)
+                    analysis_result.append(frame_result)
+                    yield "frame", frame_result
+                analysis_result.sort(key=lambda frame_result: frame_result["frame_index"])
+
+            summary = await ai_analyzer.generate_summary(aggregator=aggregator)
+            yield "summary", summary
+
+            yield "report", report_queue.submit(summary)
+
+            yield "done", {
+                "status": "success",
+                "processed_frames": len(result["frames"]),
+                "prefiltered_frames": len([a for a in analysis_result if a.get("prefiltered")]),
+                "anomalies_detected": len([a for a in analysis_result if a.get("anomaly_detected")]),
+                "timestamp": datetime.now().isoformat()
+            }
+        except Exception as e:
+            yield "error", {"status": "error", "detail": f"Analysis failed: {str(e)}"}
+
+    async def encode():
+        async for event, data in events():
+            if format == "ndjson":
+                yield json.dumps({"event": event, "data": data}, default=str) + "\n"
+            else:
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    # Tell proxies not to buffer, so each event reaches the client immediately
+    return StreamingResponse(encode(), media_type=media_type,
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/reports/{report_id}")
+async def get_report_status(report_id: str):
+    """Get the rendering status of a summary report"""
+    status = report_queue.status(report_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return status
+
+@app.get("/api/reports/{report_id}/download")
+async def download_report(report_id: str):
+    """Download a summary report PDF, waiting for it if it is still rendering"""
+    status = await report_queue.wait(report_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Report not found")
+    if status["status"] != "ready":
+        raise HTTPException(status_code=500, detail=f"Report rendering failed: {status['error']}")
+    return FileResponse(
+        report_queue.path(report_id), media_type="application/pdf", filename=f"report_{report_id}.pdf"
+    )
+
+@app.get("/api/ai/rate-limit")
+async def get_rate_limit_status():
+    """Get shared Gemini rate limiter queue depth and wait times"""
+    return {
+        **gemini_rate_limiter.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/ai/cache")
+async def get_analysis_cache_status():
+    """Get frame analysis cache hit/miss counters"""
+    if ai_analyzer.analysis_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **(await asyncio.to_thread(ai_analyzer.analysis_cache.stats))}
+
 @app.get("/api/drone/summary")
 async def get_drone_summary():
     """Get drone surveillance summary"""
@@ -280,49 +487,195 @@ async def create_alert(request: Request):
     print("Alert received:", data)
     return {"status": "alert created"}
 
-@app.post("/api/incidents/create")
-async def create_incident(incident: IncidentCreate):
-    """Create new incident and trigger multi-agent analysis"""
+async def analyze_incident(incident_details: Dict[str, Any], ticket: Dict[str, Any],
+                           progress: Optional[Callable[[str], Awaitable[None]]] = None) -> Dict[str, Any]:
+    """Run the multi-agent analysis, maps lookup and emergency routing for an incident"""
+    # Wait for analysis capacity; urgent incidents are admitted ahead of the backlog
+    queue_wait = await incident_scheduler.acquire(ticket)
     try:
+        analysis_started = time.perf_counter()
         # Process incident with multi-agent system
-        agent_response = await multi_agent_manager.process_incident(incident.dict())
-        
-        # Get affected areas
-        affected_areas = await maps_service.get_affected_areas(
-            agent_response.get("location", "")
+        if progress:
+            await progress("agents")
+        agent_response = await multi_agent_manager.process_incident(incident_details)
+    finally:
+        incident_scheduler.release()
+    timings = dict(agent_response.get("timings", {}))
+    timings["queue_wait_seconds"] = queue_wait
+    timings["agents_seconds"] = round(time.perf_counter() - analysis_started, 4)
+    stage_started = time.perf_counter()
+    
+    # Get affected areas
+    if progress:
+        await progress("maps")
+    affected_areas = await maps_service.get_affected_areas(
+        agent_response.get("location", "")
+    )
+    timings["maps_seconds"] = round(time.perf_counter() - stage_started, 4)
+    stage_started = time.perf_counter()
+    
+    # Get emergency routing
+    if progress:
+        await progress("routing")
+    emergency_info = await emergency_router.get_nearest_emergency_station(
+        affected_areas["coordinates"]["lat"],
+        affected_areas["coordinates"]["lng"],
+        agent_response.get("incident_type", "general")
+    )
+    timings["routing_seconds"] = round(time.perf_counter() - stage_started, 4)
+    
+    return {
+        "status": agent_response.get("status", "success"),
+        "agent_response": agent_response,
+        "affected_areas": affected_areas,
+        "emergency_info": emergency_info,
+        "timings": timings
+    }
+
+async def run_incident_analysis(incident_details: Dict[str, Any],
+                                progress: Optional[Callable[[str], Awaitable[None]]] = None):
+    """Analyze an incident, sharing the run with duplicate reports when coalescing is on"""
+    ticket = incident_scheduler.ticket(incident_priority(incident_details))
+    if incident_coalescer is None:
+        return await analyze_incident(incident_details, ticket, progress), {"analysis_id": None, "coalesced": False}
+    # Reports of the same place and type share one in-flight analysis and its progress;
+    # the shared analysis is scheduled at the highest priority among them
+    return await incident_coalescer.run(
+        incident_details, lambda flight_progress: analyze_incident(incident_details, ticket, flight_progress),
+        progress, shared=ticket,
+        on_join=lambda flight_ticket: incident_scheduler.raise_priority(flight_ticket, ticket["level"])
+    )
+
+def new_incident_record(incident_details: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": len(monitoring_data["incidents"]) + 1,
+        "timestamp": datetime.now().isoformat(),
+        "status": "active",
+        "processing_status": "queued",
+        "processing_stages": [],
+        "processing_error": None,
+        "original_data": incident_details,
+        "agent_analysis": {},
+        "affected_areas": {},
+        "emergency_response": {},
+        "preventive_measures": [],
+        "analysis_id": None,
+        "coalesced": False
+    }
+
+def apply_incident_analysis(incident_data: Dict[str, Any], analysis: Dict[str, Any], flight: Dict[str, Any]):
+    incident_data.update({
+        "agent_analysis": analysis["agent_response"],
+        "affected_areas": analysis["affected_areas"],
+        "emergency_response": analysis["emergency_info"],
+        "preventive_measures": analysis["agent_response"].get("preventive_measures", []),
+        "analysis_id": flight["analysis_id"],
+        "coalesced": flight["coalesced"]
+    })
+
+async def publish_incident_progress(incident_data: Dict[str, Any], stage: str, **details):
+    """Record a processing stage on the incident and queue it for /ws clients.
+
+    Delivery happens in the background, so slow WebSocket clients never hold up
+    the analysis (or the other reports attached to a shared one).
+    """
+    timestamp = datetime.now().isoformat()
+    incident_data["processing_status"] = stage
+    incident_data["processing_stages"].append({"stage": stage, "timestamp": timestamp})
+    manager.publish(json.dumps({
+        "type": "incident_progress",
+        "incident_id": incident_data["id"],
+        "stage": stage,
+        "timestamp": timestamp,
+        **details
+    }, default=str))
+
+async def process_incident_job(incident_data: Dict[str, Any]):
+    """Background pipeline for an incident accepted with async_mode"""
+    try:
+        await publish_incident_progress(incident_data, "analyzing")
+        analysis, flight = await run_incident_analysis(
+            incident_data["original_data"],
+            lambda stage: publish_incident_progress(incident_data, stage)
         )
-        
-        # Get emergency routing
-        emergency_info = await emergency_router.get_nearest_emergency_station(
-            affected_areas["coordinates"]["lat"],
-            affected_areas["coordinates"]["lng"],
-            agent_response.get("incident_type", "general")
+        apply_incident_analysis(incident_data, analysis, flight)
+        incident_data["timings"] = analysis["timings"]
+        await publish_incident_progress(
+            incident_data, "completed", analysis_id=flight["analysis_id"], coalesced=flight["coalesced"]
         )
+    except Exception as e:
+        incident_data["processing_error"] = str(e)
+        await publish_incident_progress(incident_data, "failed", error=str(e))
+
+@app.post("/api/incidents/create")
+async def create_incident(incident: IncidentCreate, async_mode: bool = False):
+    """Create new incident and trigger multi-agent analysis.
+
+    With async_mode the incident is stored and queued immediately and the response
+    is 202 Accepted; progress is pushed over /ws and polled at /api/incidents/{id}/status.
+    """
+    if async_mode:
+        incident_data = new_incident_record(incident.dict())
+        try:
+            incident_jobs.submit(lambda: process_incident_job(incident_data))
+        except asyncio.QueueFull:
+            raise HTTPException(status_code=503, detail="Incident queue is full, retry shortly")
+        monitoring_data["incidents"].append(incident_data)
+        incident_data["processing_stages"].append({"stage": "queued", "timestamp": incident_data["timestamp"]})
+        return JSONResponse(status_code=202, content={
+            "status": "accepted",
+            "incident_id": incident_data["id"],
+            "processing_status": "queued",
+            # Analyses it waits behind now; more urgent reports arriving later can still overtake it
+            "queue_position": incident_scheduler.queued_ahead(incident_priority(incident_data["original_data"])),
+            "status_url": f"/api/incidents/{incident_data['id']}/status"
+        })
+    
+    try:
+        request_started = time.perf_counter()
+        incident_details = incident.dict()
+        analysis, flight = await run_incident_analysis(incident_details)
+        timings = dict(analysis["timings"])
+        timings["total_seconds"] = round(time.perf_counter() - request_started, 4)
         
-        incident_data = {
-            "id": len(monitoring_data["incidents"]) + 1,
-            "timestamp": datetime.now().isoformat(),
-            "status": "active",
-            "original_data": incident.dict(),
-            "agent_analysis": agent_response,
-            "affected_areas": affected_areas,
-            "emergency_response": emergency_info,
-            "preventive_measures": agent_response.get("preventive_measures", [])
-        }
+        incident_data = new_incident_record(incident_details)
+        apply_incident_analysis(incident_data, analysis, flight)
+        incident_data["processing_status"] = "completed"
+        incident_data["timings"] = timings
         
         monitoring_data["incidents"].append(incident_data)
         
         return {
             "status": "success",
             "incident_id": incident_data["id"],
-            "analysis": agent_response,
-            "affected_areas": affected_areas,
-            "emergency_response": emergency_info
+            "analysis": incident_data["agent_analysis"],
+            "affected_areas": incident_data["affected_areas"],
+            "emergency_response": incident_data["emergency_response"],
+            "analysis_id": flight["analysis_id"],
+            "coalesced": flight["coalesced"],
+            "timings": timings
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process incident: {str(e)}")
 
+@app.get("/api/incidents/queue")
+async def get_incident_queue_status():
+    """Get background incident job counters"""
+    return incident_jobs.stats()
+
+@app.get("/api/incidents/scheduler")
+async def get_incident_scheduler_status():
+    """Get running analyses and queue wait times per incident priority"""
+    return incident_scheduler.stats()
+
+@app.get("/api/incidents/coalescing")
+async def get_incident_coalescing_status():
+    """Get counters for incident analyses that were shared between duplicate reports"""
+    if incident_coalescer is None:
+        return {"enabled": False}
+    return {"enabled": True, **incident_coalescer.stats()}
+
 @app.get("/api/incidents/{incident_id}")
 async def get_incident(incident_id: int):
     """Get specific incident details"""
@@ -364,6 +717,22 @@ async def get_emergency_route(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get emergency route: {str(e)}")
 
+@app.get("/api/incidents/{incident_id}/status")
+async def get_incident_status(incident_id: int):
+    """Get processing progress for an incident"""
+    incident = next((i for i in monitoring_data["incidents"] if i["id"] == incident_id), None)
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    return {
+        "incident_id": incident_id,
+        "processing_status": incident.get("processing_status", "completed"),
+        "stages": incident.get("processing_stages", []),
+        "error": incident.get("processing_error"),
+        "analysis_id": incident.get("analysis_id"),
+        "coalesced": incident.get("coalesced", False),
+        "timings": incident.get("timings", {})
+    }
+
 @app.get("/api/preventive-measures/{incident_id}")
 async def get_preventive_measures(incident_id: int):
     """Get preventive measures for an incident"""
@@ -381,8 +750,12 @@ async def get_preventive_measures(incident_id: int):
 from fastapi import WebSocket, WebSocketDisconnect
 
 class ConnectionManager:
-    def __init__(self):
+    def __init__(self, outbox_size: int = 1000):
         self.active_connections: List[WebSocket] = []
+        self.outbox_size = outbox_size
+        self.dropped_messages = 0
+        self._outbox = None
+        self._sender = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
@@ -392,12 +765,32 @@ class ConnectionManager:
         self.active_connections.remove(websocket)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
+        for connection in list(self.active_connections):
             try:
                 await connection.send_text(message)
             except:
                 pass
 
+    def publish(self, message: str):
+        """Queue a message for broadcast without waiting for clients.
+
+        One sender task delivers queued messages in order; when clients fall so far
+        behind that the outbox is full, new messages are dropped (incident progress
+        can still be polled over HTTP).
+        """
+        if self._sender is None or self._sender.done():
+            self._outbox = asyncio.Queue(maxsize=self.outbox_size)
+            self._sender = asyncio.create_task(self._send_outbox())
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped_messages += 1
+
+    async def _send_outbox(self):
+        while True:
+            message = await self._outbox.get()
+            await self.broadcast(message)
+
 manager = ConnectionManager()
 
 @app.websocket("/ws")
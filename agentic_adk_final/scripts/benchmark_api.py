@@ -0,0 +1,162 @@
+"""Benchmark /api/drone/analyze and /api/incidents/create against the local Gemini stand-in.
+
+Starts the real FastAPI app under uvicorn with GEMINI_STUB_ENABLED=true, drives it with
+concurrent requests and reports throughput, latency percentiles and per-stage timings.
+
+Run from the agentic_adk_final directory:
+    python scripts/benchmark_api.py [--scenario drone|incident|both] [--requests 20] [--concurrency 4]
+        [--latency-ms 800] [--latency-sigma 0.35] [--error-rate 0.0] [--templates responses.json]
+        [--no-async --fallback-workers 4] [--requests-per-second 50] [--repeat-incident]
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_VIDEO = APP_DIR.parent / "drishti-ai-system" / "public" / "videos" / "cam-4.mp4"
+
+INCIDENT = {
+    "title": "Crowd build-up",
+    "description": "Dense crowd forming near the main exit, people being pushed",
+    "location": "Central Station",
+    "incident_type": "crowd",
+    "priority": 3
+}
+
+
+def start_server(args) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "GEMINI_STUB_ENABLED": "true",
+        "GEMINI_STUB_LATENCY_MS": str(args.latency_ms),
+        "GEMINI_STUB_LATENCY_SIGMA": str(args.latency_sigma),
+        "GEMINI_STUB_ERROR_RATE": str(args.error_rate),
+        "GEMINI_STUB_TEMPLATES_PATH": args.templates,
+        "GEMINI_STUB_SEED": str(args.seed),
+        "GEMINI_ASYNC_ENABLED": str(not args.no_async).lower(),
+        # Repeated requests for one clip would otherwise only measure the cache
+        "ANALYSIS_CACHE_ENABLED": str(args.with_cache).lower(),
+    }
+    if args.fallback_workers:
+        env["GEMINI_FALLBACK_WORKERS"] = str(args.fallback_workers)
+    if args.requests_per_second:
+        env["GEMINI_REQUESTS_PER_SECOND"] = str(args.requests_per_second)
+        env["GEMINI_BURST_REQUESTS"] = str(max(int(args.requests_per_second), 1))
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=APP_DIR, env=env
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/api/dashboard/status")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Server did not become ready")
+
+
+async def drone_request(client: httpx.AsyncClient, video_bytes: bytes, video_name: str):
+    return await client.post("/api/drone/analyze", files={"video_file": (video_name, video_bytes, "video/mp4")})
+
+
+async def incident_request(client: httpx.AsyncClient, number: int = None):
+    # Distinct locations keep coalescing and the per-incident agent memo from answering repeats
+    incident = INCIDENT if number is None else {**INCIDENT, "location": f"{INCIDENT['location']} gate {number}"}
+    return await client.post("/api/incidents/create", json=incident)
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, make_request, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, stage_timings, errors = [], {}, 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await make_request()
+            except httpx.HTTPError:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+                return
+            for stage, seconds in response.json().get("timings", {}).items():
+                stage_timings.setdefault(stage, []).append(seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    print(f"\n== {name}: {requests} requests, concurrency {concurrency} ==")
+    print(f"throughput: {requests / elapsed:.2f} req/s   errors: {errors}   wall: {elapsed:.2f}s")
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"latency (s): p50 {p50:.3f}   p95 {p95:.3f}   p99 {p99:.3f}   max {max(latencies):.3f}")
+    if stage_timings:
+        print(f"{'stage':<24}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}")
+        for stage, values in stage_timings.items():
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            print(f"{stage:<24}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=["drone", "incident", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--video", default=str(DEFAULT_VIDEO))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--base-url", help="benchmark an already running server instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--latency-sigma", type=float, default=0.35)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--templates", default="", help="JSON file of stub responses by kind")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--with-cache", action="store_true", help="keep the frame analysis cache enabled")
+    parser.add_argument("--no-async", action="store_true", help="call the blocking generate_content on threads")
+    parser.add_argument("--fallback-workers", type=int, help="threads for blocking model calls")
+    parser.add_argument("--requests-per-second", type=float, help="override the shared Gemini rate limit")
+    parser.add_argument("--repeat-incident", action="store_true",
+                        help="send one identical incident, measuring coalescing instead of full analyses")
+    args = parser.parse_args()
+
+    server = None if args.base_url else start_server(args)
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=600) as client:
+            await wait_until_ready(client)
+            if args.scenario in ("drone", "both"):
+                video_bytes = Path(args.video).read_bytes()
+                video_name = Path(args.video).name
+                await run_scenario(client, "drone analyze", lambda: drone_request(client, video_bytes, video_name),
+                                   args.requests, args.concurrency)
+            if args.scenario in ("incident", "both"):
+                numbers = itertools.count()
+                await run_scenario(
+                    client, "incident create",
+                    lambda: incident_request(client, None if args.repeat_incident else next(numbers)),
+                    args.requests, args.concurrency
+                )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""Compare seek and sequential frame sampling on the bundled camera clips.
+
+Run from the agentic_adk_final directory:
+    python scripts/benchmark_frame_sampling.py [--max-frames 10] [--repeat 3]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2
+from services.video_processor import VideoProcessor
+
+DEFAULT_VIDEOS_DIR = Path(__file__).resolve().parents[2] / "drishti-ai-system" / "public" / "videos"
+
+
+async def time_mode(processor: VideoProcessor, video_path: str, max_frames: int, mode: str, repeat: int) -> float:
+    """Return the best wall time over `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await processor._extract_frames(video_path, max_frames=max_frames, mode=mode, deduplicate=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos-dir", default=str(DEFAULT_VIDEOS_DIR))
+    parser.add_argument("--max-frames", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    videos = sorted(Path(args.videos_dir).glob("cam-*.mp4"))
+    if not videos:
+        print(f"No cam-*.mp4 clips found in {args.videos_dir}")
+        return
+
+    processor = VideoProcessor()
+    print(f"{'clip':<12}{'frames':>8}{'step':>6}{'auto':>12}{'seek (s)':>10}{'seq (s)':>10}{'speedup':>9}")
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        step = max(total_frames // args.max_frames, 1)
+
+        seek_time = await time_mode(processor, str(video), args.max_frames, "seek", args.repeat)
+        seq_time = await time_mode(processor, str(video), args.max_frames, "sequential", args.repeat)
+        auto_mode = processor._choose_sampling_mode(total_frames, step)
+
+        print(f"{video.name:<12}{total_frames:>8}{step:>6}{auto_mode:>12}"
+              f"{seek_time:>10.3f}{seq_time:>10.3f}{seek_time / seq_time:>8.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
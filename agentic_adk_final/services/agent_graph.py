@@ -0,0 +1,128 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+class AgentNode:
+    """One agent in an AgentGraph.
+
+    `run` is called with the declared inputs as keyword arguments and its return
+    value is published under `output` for downstream nodes.
+    """
+
+    def __init__(self, name: str, run: Callable[..., Awaitable[Dict[str, Any]]],
+                 inputs: List[str], output: str, timeout: Optional[float] = None):
+        self.name = name
+        self.run = run
+        self.inputs = inputs
+        self.output = output
+        self.timeout = timeout
+
+
+class AgentGraph:
+    """Runs agents as a dependency graph: each node starts as soon as its inputs exist.
+
+    Nodes that do not depend on each other run concurrently, so the graph takes as
+    long as its slowest dependency chain. A node that times out or raises publishes a
+    {"status": "timeout" | "error"} result so its dependents still run with partial data.
+    """
+
+    def __init__(self, nodes: List[AgentNode], initial_inputs: List[str], timeout: Optional[float] = None):
+        self.timeout = timeout
+        self.initial_inputs = set(initial_inputs)
+        self.nodes = self._topological_order(nodes)
+
+    def _topological_order(self, nodes: List[AgentNode]) -> List[AgentNode]:
+        producers = {}
+        for node in nodes:
+            if node.output in producers or node.output in self.initial_inputs:
+                raise ValueError(f"Output '{node.output}' is produced more than once")
+            producers[node.output] = node
+
+        ordered, visiting, done = [], set(), set()
+
+        def visit(node: AgentNode):
+            if node.name in done:
+                return
+            if node.name in visiting:
+                raise ValueError(f"Agent graph has a cycle through '{node.name}'")
+            visiting.add(node.name)
+            for key in node.inputs:
+                if key in producers:
+                    visit(producers[key])
+                elif key not in self.initial_inputs:
+                    raise ValueError(f"Agent '{node.name}' needs '{key}', which nothing provides")
+            visiting.discard(node.name)
+            done.add(node.name)
+            ordered.append(node)
+
+        for node in nodes:
+            visit(node)
+        return ordered
+
+    def stages(self) -> List[List[AgentNode]]:
+        """Nodes grouped by dependency depth; each stage only needs results of earlier stages"""
+        producers = {node.output: node for node in self.nodes}
+        depth: Dict[str, int] = {}
+        for node in self.nodes:
+            depth[node.name] = 1 + max(
+                (depth[producers[key].name] for key in node.inputs if key in producers), default=-1
+            )
+        stages: List[List[AgentNode]] = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+        for node in self.nodes:
+            stages[depth[node.name]].append(node)
+        return stages
+
+    async def run(self, inputs: Dict[str, Any], memo: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Run every node and return {"results", "timings", "failed", "memoized"}.
+
+        Results of nodes that succeeded on complete inputs are stored in `memo` by node
+        name and reused on later runs with the same memo, so each incident pays for
+        each agent once.
+        """
+        memo = memo if memo is not None else {}
+        tasks: Dict[str, asyncio.Task] = {}
+        timings: Dict[str, float] = {}
+        memoized: List[str] = []
+
+        async def value_of(key: str):
+            return await tasks[key] if key in tasks else inputs[key]
+
+        async def run_node(node: AgentNode):
+            if node.name in memo:
+                memoized.append(node.name)
+                timings[node.name] = 0.0
+                return memo[node.name]
+
+            node_inputs = {key: await value_of(key) for key in node.inputs}
+            timeout = node.timeout or self.timeout
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(node.run(**node_inputs), timeout=timeout)
+            except asyncio.TimeoutError:
+                result = {"status": "timeout", "error": f"{node.name} agent did not finish within {timeout} seconds"}
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+            timings[node.name] = round(time.perf_counter() - started, 4)
+
+            # Results built on a failed upstream agent are not reused
+            upstream_failed = any(_failed(node_inputs[key]) for key in node.inputs if key in tasks)
+            if not _failed(result) and not upstream_failed:
+                memo[node.name] = result
+            return result
+
+        # Topological order guarantees a node's producers are scheduled before it
+        for node in self.nodes:
+            tasks[node.output] = asyncio.create_task(run_node(node))
+        await asyncio.gather(*tasks.values())
+
+        results = {node.output: tasks[node.output].result() for node in self.nodes}
+        return {
+            "results": results,
+            "timings": timings,
+            "failed": [node.name for node in self.nodes if _failed(results[node.output])],
+            "memoized": memoized
+        }
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("status") in ("timeout", "error")
@@ -1,13 +1,87 @@
 import asyncio
-from typing import List, Dict, Any
+import hashlib
+import json
+from typing import List, Dict, Any, Optional, Union, AsyncIterable, AsyncIterator
 import base64
 from pathlib import Path
 import os
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 from datetime import datetime
-import textwrap
 
+from services.analysis_cache import AnalysisCache
+from services.frame_buffer import FrameHandle, as_frame_handle
+from services.frame_prefilter import FramePrefilter
+from services.frame_preprocessor import FramePreprocessor
+from services.gemini_client import gemini_client
+from services.gemini_stub import stub_model_from_settings
+from services.rate_limiter import gemini_rate_limiter, estimate_tokens, PRIORITY_FRAME, PRIORITY_SUMMARY
+from services.report_renderer import render_summary_pdf
+from services.summary_aggregator import SummaryAggregator
+from utils.config import settings
+
+MODEL_NAME = "gemini-2.0-flash"
+
+# Weight of the newest sample in the per-frame latency moving average
+LATENCY_EMA_ALPHA = 0.3
+
+SAFETY_CHECKLIST = """
+            Look for:
+            1. People in distress or calling for help
+            2. Overcrowding or dangerous crowd density
+            3. People falling or being pushed
+            4. Panic or chaotic behavior
+            5. Emergency situations (fire, medical emergency, etc.)
+            6. Suspicious or dangerous activities
+            7. Blocked emergency exits
+            8. Any other safety concerns
+"""
+
+FRAME_PROMPT = """
+            Analyze this image for any signs of distress, crowd crush, emergency situations, or safety concerns in a crowded public place.
+""" + SAFETY_CHECKLIST + """
+            Respond in JSON format with:
+            {
+                "anomaly_detected": true/false,
+                "severity": "low/medium/high/critical",
+                "description": "detailed description of what you see",
+                "safety_concerns": ["list of specific concerns"],
+                "recommended_actions": ["list of recommended immediate actions"],
+                "coordinates": {"x": approximate_x, "y": approximate_y} // if specific location in image
+            }
+
+            If no safety concerns are found, set anomaly_detected to false and provide a brief description of the normal scene.
+            """
+
+BATCH_PROMPT = """
+            You are given {count} images labelled Frame 0 to Frame {last}. Analyze each image independently for any signs of distress, crowd crush, emergency situations, or safety concerns in a crowded public place.
+""" + SAFETY_CHECKLIST + """
+            Respond with only a JSON object of this form, one entry per frame:
+            {{
+                "frames": [
+                    {{
+                        "frame": frame_number,
+                        "anomaly_detected": true/false,
+                        "severity": "low/medium/high/critical",
+                        "description": "detailed description of what you see",
+                        "safety_concerns": ["list of specific concerns"],
+                        "recommended_actions": ["list of recommended immediate actions"],
+                        "coordinates": {{"x": approximate_x, "y": approximate_y}} // if specific location in image
+                    }}
+                ]
+            }}
+
+            If no safety concerns are found in a frame, set anomaly_detected to false and provide a brief description of the normal scene.
+            """
+
+# Ordered from least to most severe, as returned by _calculate_risk_level
+RISK_LEVELS = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+LOCAL_SUMMARY_TEMPLATE = """
+1. Overall safety assessment: {assessment}
+2. Key findings and concerns: {concerns}
+3. Risk level evaluation: {risk_level}
+4. Immediate action recommendations: {actions}
+5. Preventive measures for future: Continue routine monitoring of crowd density and keep emergency exits clear.
+"""
 
 # Try to import Google GenerativeAI
 try:
@@ -21,113 +95,210 @@ except ImportError:
 class AIAnalyzer:
     def __init__(self):
         self.model = None
-        if GENAI_AVAILABLE:
+        self.frame_latency_ema = None
+        self.preprocessor = None
+        if settings.frame_preprocess_enabled:
+            self.preprocessor = FramePreprocessor(
+                max_edge=settings.frame_max_edge,
+                image_format=settings.frame_encode_format,
+                quality=settings.frame_encode_quality
+            )
+        self.prefilter = None
+        if settings.prefilter_enabled:
+            self.prefilter = FramePrefilter(
+                threshold=settings.prefilter_threshold,
+                use_hog=settings.prefilter_use_hog
+            )
+        self.analysis_cache = None
+        if settings.analysis_cache_enabled:
+            self.analysis_cache = AnalysisCache(
+                db_path=settings.analysis_cache_path,
+                version_tag=self._analysis_version_tag(),
+                ttl_seconds=settings.analysis_cache_ttl_seconds,
+                max_entries=settings.analysis_cache_max_entries,
+                memory_entries=settings.analysis_cache_memory_entries,
+                evict_every=settings.analysis_cache_evict_every
+            )
+        if settings.gemini_stub_enabled:
+            self.model = stub_model_from_settings(MODEL_NAME)
+        elif GENAI_AVAILABLE:
             api_key = os.getenv("GOOGLE_API_KEY")
             if api_key:
                 genai.configure(api_key=api_key)
-                self.model = genai.GenerativeModel("gemini-2.0-flash")
+                self.model = genai.GenerativeModel(MODEL_NAME)
             else:
                 print("Warning: GOOGLE_API_KEY not found")
         else:
             print("Using fallback AI analysis")
         
-    async def analyze_frames(self, frame_paths: List[str]) -> List[Dict[str, Any]]:
-        """Analyze frames for distress, crowd crush, or safety issues"""
-        results = []
-        
-        for i, frame_path in enumerate(frame_paths):
+    async def analyze_frames(self, frames: List[Union[FrameHandle, str]],
+                             concurrency: int = None, batch_size: int = None) -> List[Dict[str, Any]]:
+        """Analyze frames (in-memory handles or file paths) for distress, crowd crush, or safety issues
+
+        Up to `concurrency` requests (default settings.frame_analysis_concurrency) are in
+        flight at once; results are returned in frame order. With batch_size > 1
+        (default settings.frame_batch_size) each request carries that many frames.
+        Frames the local pre-filter scores below its threshold are not sent.
+        """
+        results = [result async for result in self.analyze_frames_as_completed(frames, concurrency, batch_size)]
+        return sorted(results, key=lambda result: result["frame_index"])
+
+    async def analyze_frames_as_completed(self, frames: List[Union[FrameHandle, str]],
+                                          concurrency: int = None, batch_size: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Same as analyze_frames, but yields each result as soon as its request completes"""
+        semaphore = asyncio.Semaphore(concurrency or settings.frame_analysis_concurrency)
+        batch_size = max(batch_size or settings.frame_batch_size, 1)
+        indexed = list(enumerate(frames))
+        scores, local_results = {}, {}
+        if self.prefilter is not None and indexed:
+            indexed, scores, local_results = await self._prefilter_frames(indexed)
+        batches = [indexed[i:i + batch_size] for i in range(0, len(indexed), batch_size)]
+
+        async def analyze_bounded(batch: List[tuple]) -> List[Dict[str, Any]]:
+            async with semaphore:
+                try:
+                    if len(batch) == 1:
+                        i, frame = batch[0]
+                        return [await self._analyze_single_frame(frame, i)]
+                    return await self._analyze_frame_batch(batch)
+                except Exception as e:
+                    return [
+                        {
+                            "frame_index": i,
+                            "frame_path": frame.path if isinstance(frame, FrameHandle) else frame,
+                            "status": "error",
+                            "error": str(e),
+                            "anomaly_detected": False
+                        }
+                        for i, frame in batch
+                    ]
+
+        for result in local_results.values():
+            yield result
+
+        tasks = [asyncio.ensure_future(analyze_bounded(batch)) for batch in batches]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                for result in await completed:
+                    if result["frame_index"] in scores:
+                        result.setdefault("prefilter", scores[result["frame_index"]])
+                    yield result
+        finally:
+            # The consumer stopped early (e.g. a streaming client disconnected)
+            for task in tasks:
+                task.cancel()
+
+    async def analyze_frame_stream(self, frames: AsyncIterable[FrameHandle],
+                                   concurrency: int = None) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze frames as they arrive, yielding each result as soon as it is ready.
+
+        Up to `concurrency` frames (default settings.frame_analysis_concurrency) are in
+        flight at once; when all slots are busy, reading from `frames` waits for one.
+        """
+        semaphore = asyncio.Semaphore(concurrency or settings.frame_analysis_concurrency)
+        session = self.prefilter.session() if self.prefilter is not None else None
+        results = asyncio.Queue()
+        tasks = set()
+
+        async def analyze(frame: FrameHandle, score: Dict[str, Any]):
             try:
-                result = await self._analyze_single_frame(frame_path, i)
-                results.append(result)
-                
-                # Add small delay to avoid rate limiting
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                results.append({
-                    "frame_index": i,
-                    "frame_path": frame_path,
-                    "status": "error",
-                    "error": str(e),
-                    "anomaly_detected": False
-                })
-        
-        return results
+                result = await self._analyze_single_frame(frame, frame.index)
+                if score is not None:
+                    result["prefilter"] = score
+                results.put_nowait(result)
+            finally:
+                semaphore.release()
 
-    async def _analyze_single_frame(self, frame_path: str, frame_index: int) -> Dict[str, Any]:
-        """Analyze a single frame for safety issues"""
+        async def feed():
+            try:
+                async for frame in frames:
+                    score = None
+                    if session is not None:
+                        # The pre-filter's running background needs frames in arrival order
+                        score = await asyncio.to_thread(session.score, frame)
+                        if not score["forwarded"]:
+                            results.put_nowait(self._prefiltered_result(frame.index, frame.path, score))
+                            continue
+                    await semaphore.acquire()
+                    task = asyncio.ensure_future(analyze(frame, score))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                if tasks:
+                    await asyncio.gather(*tasks)
+            finally:
+                results.put_nowait(None)
+
+        feeder = asyncio.ensure_future(feed())
         try:
-            # Read and encode image
-            with open(frame_path, "rb") as image_file:
-                image_data = image_file.read()
-            
-            # Create image part for Gemini
-            image_part = {
-                "mime_type": "image/jpeg",
-                "data": image_data
-            }
-            
-            prompt = """
-            Analyze this image for any signs of distress, crowd crush, emergency situations, or safety concerns in a crowded public place.
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+            # Re-raise a failure of the frame source
+            await feeder
+        finally:
+            # The consumer stopped early (e.g. a streaming client disconnected)
+            feeder.cancel()
+            for task in list(tasks):
+                task.cancel()
 
-            Look for:
-            1. People in distress or calling for help
-            2. Overcrowding or dangerous crowd density
-            3. People falling or being pushed
-            4. Panic or chaotic behavior
-            5. Emergency situations (fire, medical emergency, etc.)
-            6. Suspicious or dangerous activities
-            7. Blocked emergency exits
-            8. Any other safety concerns
+    async def _prefilter_frames(self, indexed: List[tuple]):
+        """Score frames locally and split them into those worth sending and local results.
 
-            Respond in JSON format with:
-            {
-                "anomaly_detected": true/false,
-                "severity": "low/medium/high/critical",
-                "description": "detailed description of what you see",
-                "safety_concerns": ["list of specific concerns"],
-                "recommended_actions": ["list of recommended immediate actions"],
-                "coordinates": {"x": approximate_x, "y": approximate_y} // if specific location in image
-            }
+        Returns (frames to send, scores by frame index, local results by frame index).
+        """
+        handles = [(i, as_frame_handle(frame, i)) for i, frame in indexed]
+        scores = await asyncio.to_thread(self.prefilter.score, [handle for _, handle in handles])
+        forwarded, by_index, local_results = [], {}, {}
+        for (i, handle), score in zip(handles, scores):
+            by_index[i] = score
+            if score["forwarded"]:
+                forwarded.append((i, handle))
+            else:
+                local_results[i] = self._prefiltered_result(i, handle.path, score)
+        return forwarded, by_index, local_results
 
-            If no safety concerns are found, set anomaly_detected to false and provide a brief description of the normal scene.
-            """
+    def _prefiltered_result(self, frame_index: int, frame_path: str, score: Dict[str, Any]) -> Dict[str, Any]:
+        """Local "no anomaly" result for a frame the pre-filter did not send"""
+        analysis = {
+            "anomaly_detected": False,
+            "severity": "low",
+            "description": f"Not sent for analysis: local pre-filter score {score['score']} is below {self.prefilter.threshold}",
+            "safety_concerns": [],
+            "recommended_actions": []
+        }
+        result = self._frame_result(frame_index, frame_path, analysis, None, None)
+        result["prefiltered"] = True
+        result["prefilter"] = score
+        return result
+
+    async def _analyze_single_frame(self, frame: Union[FrameHandle, str], frame_index: int) -> Dict[str, Any]:
+        """Analyze a single frame for safety issues"""
+        frame_path = frame.path if isinstance(frame, FrameHandle) else frame
+        try:
+            handle = as_frame_handle(frame, frame_index)
+            cache_key, cached = await self._lookup_cached(handle, frame_index, frame_path)
+            if cached is not None:
+                return cached
+            
+            handle, payload = await self._prepare_frame(handle, frame_index)
             
             # Generate response
-            response = await asyncio.to_thread(
-                self.model.generate_content,
-                [prompt, image_part],
-                safety_settings={
-                    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                }
+            response, call_seconds = await self._generate_frame_content(
+                [FRAME_PROMPT, self._image_part(handle)], estimate_tokens(FRAME_PROMPT, images=1)
             )
+            self._record_frame_latency(call_seconds)
             
-            # Parse JSON response
-            import json
-            try:
-                analysis = json.loads(response.text)
-            except json.JSONDecodeError:
-                # Fallback if response is not valid JSON
-                analysis = {
-                    "anomaly_detected": "distress" in response.text.lower() or "emergency" in response.text.lower(),
-                    "severity": "medium" if "distress" in response.text.lower() else "low",
-                    "description": response.text,
-                    "safety_concerns": [],
-                    "recommended_actions": []
-                }
-            
-            return {
-                "frame_index": frame_index,
-                "frame_path": frame_path,
-                "status": "success",
-                "analysis": analysis,
-                "anomaly_detected": analysis.get("anomaly_detected", False),
-                "severity": analysis.get("severity", "low"),
-                "raw_response": response.text
-            }
+            analysis = self._parse_frame_analysis(response.text)
+            parsed = analysis is not None
+            if not parsed:
+                analysis = self._fallback_frame_analysis(response.text)
+            result = self._frame_result(frame_index, frame_path, analysis, response.text, payload)
+            # A keyword guess from an unparsable response is not worth serving again
+            if parsed:
+                await self._store_cached(cache_key, result)
+            return result
             
         except Exception as e:
             return {
@@ -138,38 +309,223 @@ class AIAnalyzer:
                 "anomaly_detected": False
             }
 
-    async def generate_summary(self, analysis_results: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Generate summary of all frame analyses"""
+    async def _analyze_frame_batch(self, batch: List[tuple]) -> List[Dict[str, Any]]:
+        """Analyze several frames in one request and split the indexed response per frame.
+
+        Cached frames are answered without being sent. Frames missing from the
+        response, or every frame if it does not parse, fall back to single-frame calls.
+        """
+        results = {}
+        pending = []
+        for frame_index, frame in batch:
+            frame_path = frame.path if isinstance(frame, FrameHandle) else frame
+            handle = as_frame_handle(frame, frame_index)
+            cache_key, cached = await self._lookup_cached(handle, frame_index, frame_path)
+            if cached is not None:
+                results[frame_index] = cached
+            else:
+                pending.append((frame_index, frame, frame_path, handle, cache_key))
+
+        if pending:
+            prepared = [await self._prepare_frame(handle, frame_index) for frame_index, _, _, handle, _ in pending]
+
+            contents = [BATCH_PROMPT.format(count=len(pending), last=len(pending) - 1)]
+            for position, (handle, _) in enumerate(prepared):
+                contents.extend([f"Frame {position}:", self._image_part(handle)])
+
+            response, call_seconds = await self._generate_frame_content(
+                contents, estimate_tokens(BATCH_PROMPT, images=len(pending))
+            )
+            self._record_frame_latency(call_seconds / len(pending))
+
+            by_position = self._parse_batch_analysis(response.text)
+            for position, ((frame_index, frame, frame_path, _, cache_key), (_, payload)) in enumerate(zip(pending, prepared)):
+                analysis = by_position.get(position)
+                if analysis is None:
+                    results[frame_index] = await self._analyze_single_frame(frame, frame_index)
+                else:
+                    result = self._frame_result(frame_index, frame_path, analysis, response.text, payload, batched=True)
+                    await self._store_cached(cache_key, result)
+                    results[frame_index] = result
+
+        return [results[frame_index] for frame_index, _ in batch]
+
+    async def _lookup_cached(self, handle: FrameHandle, frame_index: int, frame_path: str):
+        """Return (cache key, cached result or None) for a frame's encoded bytes"""
+        if self.analysis_cache is None:
+            return None, None
+        cache_key = self.analysis_cache.key(handle.view)
+        cached = await asyncio.to_thread(self.analysis_cache.get, cache_key)
+        if cached is None:
+            return cache_key, None
+        result = self._frame_result(frame_index, frame_path, cached["analysis"], cached["raw_response"], None)
+        result["cached"] = True
+        return cache_key, result
+
+    async def _store_cached(self, cache_key: str, result: Dict[str, Any]):
+        if cache_key is not None:
+            await asyncio.to_thread(self.analysis_cache.put, cache_key, {
+                "analysis": result["analysis"],
+                "raw_response": result["raw_response"]
+            })
+
+    async def _prepare_frame(self, frame: Union[FrameHandle, str], frame_index: int):
+        """Load the frame and shrink its payload before upload; returns (handle, payload stats)"""
+        handle = as_frame_handle(frame, frame_index)
+        payload = None
+        if self.preprocessor is not None:
+            handle, payload = await asyncio.to_thread(self.preprocessor.prepare, handle)
+        return handle, payload
+
+    def _image_part(self, handle: FrameHandle) -> Dict[str, Any]:
+        # Create image part for Gemini
+        return {
+            "mime_type": handle.mime_type,
+            "data": handle.tobytes()
+        }
+
+    async def _generate_frame_content(self, contents: list, tokens: int):
+        """Rate-limited frame analysis call with safety filters relaxed for emergency footage.
+
+        Returns (response, call seconds); the time spent queued in the rate limiter is
+        excluded so the measured latency reflects the model alone.
+        """
+        await gemini_rate_limiter.acquire(PRIORITY_FRAME, tokens=tokens)
+        safety_settings = None
+        if GENAI_AVAILABLE:
+            safety_settings = {
+                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+            }
+        loop = asyncio.get_event_loop()
+        call_started = loop.time()
+        response = await gemini_client.generate_content(
+            self.model,
+            contents,
+            safety_settings=safety_settings
+        )
+        return response, loop.time() - call_started
+
+    def _parse_frame_analysis(self, text: str) -> Optional[Dict[str, Any]]:
+        """Parse a single-frame JSON response; None if it is not a JSON object"""
         try:
-            # Count anomalies and severity levels
-            total_frames = len(analysis_results)
-            anomalies = [r for r in analysis_results if r.get("anomaly_detected", False)]
-            
-            severity_counts = {}
-            all_concerns = []
-            all_actions = []
-            
-            for result in anomalies:
-                if result.get("status") == "success":
-                    analysis = result.get("analysis", {})
-                    severity = analysis.get("severity", "low")
-                    severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                    
-                    concerns = analysis.get("safety_concerns", [])
-                    actions = analysis.get("recommended_actions", [])
-                    
-                    all_concerns.extend(concerns)
-                    all_actions.extend(actions)
-            
-            # Generate AI summary
-            summary_prompt = f"""
-            Based on the analysis of {total_frames} video frames from a crowded public place surveillance system:
+            analysis = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return analysis if isinstance(analysis, dict) else None
+
+    def _fallback_frame_analysis(self, text: str) -> Dict[str, Any]:
+        """Keyword guess used when the response is not valid JSON"""
+        return {
+            "anomaly_detected": "distress" in text.lower() or "emergency" in text.lower(),
+            "severity": "medium" if "distress" in text.lower() else "low",
+            "description": text,
+            "safety_concerns": [],
+            "recommended_actions": []
+        }
+
+    def _parse_batch_analysis(self, text: str) -> Dict[int, Dict[str, Any]]:
+        """Map frame position -> analysis from a batched response; empty if it does not parse"""
+        cleaned = text.strip()
+        if cleaned.startswith("```"):
+            cleaned = cleaned.strip("`")
+            cleaned = cleaned[cleaned.find("\n") + 1:] if "\n" in cleaned else cleaned
+        try:
+            parsed = json.loads(cleaned)
+        except json.JSONDecodeError:
+            return {}
+
+        entries = parsed.get("frames", []) if isinstance(parsed, dict) else parsed
+        by_position = {}
+        if not isinstance(entries, list):
+            return by_position
+        for entry in entries:
+            if isinstance(entry, dict) and isinstance(entry.get("frame"), int):
+                by_position[entry["frame"]] = {k: v for k, v in entry.items() if k != "frame"}
+        return by_position
+
+    def _frame_result(self, frame_index: int, frame_path: str, analysis: Dict[str, Any],
+                      raw_response: str, payload: Dict[str, Any], batched: bool = False) -> Dict[str, Any]:
+        """Build the per-frame result dict returned to callers"""
+        # Coordinates refer to the downscaled image; map them back to the source frame
+        coordinates = analysis.get("coordinates")
+        if payload and payload["scale"] < 1 and isinstance(coordinates, dict):
+            for axis in ("x", "y"):
+                if isinstance(coordinates.get(axis), (int, float)):
+                    coordinates[axis] = round(coordinates[axis] / payload["scale"])
+
+        result = {
+            "frame_index": frame_index,
+            "frame_path": frame_path,
+            "status": "success",
+            "analysis": analysis,
+            "anomaly_detected": analysis.get("anomaly_detected", False),
+            "severity": analysis.get("severity", "low"),
+            "raw_response": raw_response,
+            "payload": payload
+        }
+        if batched:
+            result["batched"] = True
+        return result
+
+    def _analysis_version_tag(self) -> str:
+        """Changes whenever the model, frame prompt or payload preprocessing changes"""
+        fingerprint = json.dumps([
+            FRAME_PROMPT, settings.frame_preprocess_enabled, settings.frame_max_edge,
+            settings.frame_encode_format, settings.frame_encode_quality
+        ])
+        return f"{MODEL_NAME}:{hashlib.sha256(fingerprint.encode()).hexdigest()[:12]}"
+
+    def estimated_frame_seconds(self) -> float:
+        """Wall-clock seconds each frame adds to an analysis.
+
+        Measured per-frame latency (moving average, or the configured default) spread
+        over the frames analyzed concurrently.
+        """
+        latency = self.frame_latency_ema or settings.default_frame_analysis_seconds
+        return latency / max(settings.frame_analysis_concurrency, 1)
+
+    def _record_frame_latency(self, seconds: float):
+        if self.frame_latency_ema is None:
+            self.frame_latency_ema = seconds
+        else:
+            self.frame_latency_ema = LATENCY_EMA_ALPHA * seconds + (1 - LATENCY_EMA_ALPHA) * self.frame_latency_ema
+
+    async def generate_summary(self, analysis_results: List[Dict[str, Any]] = None,
+                               aggregator: SummaryAggregator = None) -> Dict[str, Any]:
+        """Generate summary of all frame analyses
+
+        Pass the job's SummaryAggregator to reuse its running totals; the summary is
+        memoized on it until more frames are added. Gemini only writes the prose when
+        the risk level reaches settings.summary_llm_min_risk; below that a local
+        template is used.
+        """
+        if aggregator is None:
+            aggregator = SummaryAggregator.from_results(analysis_results or [])
+        cached = aggregator.cached_summary()
+        if cached is not None:
+            return cached
 
-            - Total frames analyzed: {total_frames}
-            - Anomalies detected: {len(anomalies)}
+        try:
+            severity_counts = dict(aggregator.severity_counts)
+            risk_level = self._calculate_risk_level(severity_counts)
+            use_llm = (
+                self.model is not None
+                and RISK_LEVELS.index(risk_level) >= RISK_LEVELS.index(settings.summary_llm_min_risk.upper())
+            )
+
+            if use_llm:
+                # Generate AI summary
+                summary_prompt = f"""
+            Based on the analysis of {aggregator.total_frames} video frames from a crowded public place surveillance system:
+
+            - Total frames analyzed: {aggregator.total_frames}
+            - Anomalies detected: {aggregator.anomalies_detected}
             - Severity breakdown: {severity_counts}
-            - Safety concerns identified: {list(set(all_concerns))}
-            - Recommended actions: {list(set(all_actions))}
+            - Safety concerns identified: {aggregator.unique_concerns}
+            - Recommended actions: {aggregator.recommended_actions}
 
             Generate a comprehensive summary report including:
             1. Overall safety assessment
@@ -180,94 +536,66 @@ class AIAnalyzer:
 
             Format as a professional incident report.
             """
-            
-            summary_response = await asyncio.to_thread(
-                self.model.generate_content,
-                summary_prompt
-            )
-            
-            return {
-                "total_frames": total_frames,
-                "anomalies_detected": len(anomalies),
+
+                await gemini_rate_limiter.acquire(PRIORITY_SUMMARY, tokens=estimate_tokens(summary_prompt))
+                summary_response = await gemini_client.generate_content(
+                    self.model,
+                    summary_prompt
+                )
+                ai_summary = summary_response.text
+            else:
+                ai_summary = self._local_summary(aggregator, risk_level)
+
+            summary = {
+                "total_frames": aggregator.total_frames,
+                "anomalies_detected": aggregator.anomalies_detected,
                 "severity_breakdown": severity_counts,
-                "unique_concerns": list(set(all_concerns)),
-                "recommended_actions": list(set(all_actions)),
-                "ai_summary": summary_response.text,
-                "risk_level": self._calculate_risk_level(severity_counts),
+                "unique_concerns": aggregator.unique_concerns,
+                "recommended_actions": aggregator.recommended_actions,
+                "ai_summary": ai_summary,
+                "summary_source": "gemini" if use_llm else "local",
+                "risk_level": risk_level,
                 "timestamp": asyncio.get_event_loop().time()
             }
+            aggregator.remember_summary(summary)
+            return summary
             
         except Exception as e:
             return {
                 "status": "error",
                 "error": str(e),
-                "total_frames": len(analysis_results),
-                "anomalies_detected": len([r for r in analysis_results if r.get("anomaly_detected", False)])
+                "total_frames": aggregator.total_frames,
+                "anomalies_detected": aggregator.anomalies_detected
             }
 
+    def _local_summary(self, aggregator: SummaryAggregator, risk_level: str) -> str:
+        """Templated report for runs that do not warrant a Gemini summary"""
+        if aggregator.anomalies_detected and risk_level == "LOW":
+            assessment = (
+                f"{aggregator.anomalies_detected} of {aggregator.total_frames} frames showed minor anomalies; "
+                "no frame was rated medium severity or above."
+            )
+        elif aggregator.anomalies_detected:
+            assessment = (
+                f"{aggregator.anomalies_detected} of {aggregator.total_frames} frames showed anomalies "
+                f"(severity breakdown: {aggregator.severity_counts})."
+            )
+        else:
+            assessment = f"No safety concerns were detected in {aggregator.total_frames} analyzed frames."
+
+        return LOCAL_SUMMARY_TEMPLATE.format(
+            assessment=assessment,
+            concerns="; ".join(aggregator.unique_concerns) or "None",
+            risk_level=risk_level,
+            actions="; ".join(aggregator.recommended_actions) or "No immediate action required.",
+        ).strip()
 
     def save_summary_to_pdf(self, summary: Dict[str, Any], output_path: str = "summary_report.pdf") -> str:
-        """Save AI summary report to a PDF file"""
-        c = canvas.Canvas(output_path, pagesize=A4)
-        width, height = A4
-        y = height - 50
-        left_margin = 50
-        right_margin = 50
-        max_line_width = width - left_margin - right_margin
-
-        def draw_line(text, font_size=12, bold=False, indent=0):
-            nonlocal y
-            if bold:
-                c.setFont("Helvetica-Bold", font_size)
-            else:
-                c.setFont("Helvetica", font_size)
-
-            # Wrap the text to fit the page
-            wrapper = textwrap.TextWrapper(width=int(max_line_width // (font_size * 0.6)))
-            wrapped_lines = wrapper.wrap(text=str(text))
-
-            for wrapped_line in wrapped_lines:
-                if y < 60:
-                    c.showPage()
-                    y = height - 50
-                    c.setFont("Helvetica-Bold" if bold else "Helvetica", font_size)
-                c.drawString(left_margin + indent, y, wrapped_line)
-                y -= font_size + 5
-
-        # Header
-        draw_line("Drone Surveillance Summary Report", font_size=16, bold=True)
-        draw_line(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        draw_line("")
-
-        # Summary stats
-        draw_line("Summary Statistics:", bold=True)
-        draw_line(f"Total Frames Analyzed: {summary.get('total_frames', '-')}", indent=10)
-        draw_line(f"Anomalies Detected: {summary.get('anomalies_detected', '-')}", indent=10)
-        draw_line(f"Risk Level: {summary.get('risk_level', '-')}", indent=10)
-
-        # Severity breakdown
-        draw_line("Severity Breakdown:", bold=True)
-        for level, count in summary.get("severity_breakdown", {}).items():
-            draw_line(f"{level.capitalize()}: {count}", indent=10)
-
-        # Safety concerns
-        draw_line("Identified Safety Concerns:", bold=True)
-        for concern in summary.get("unique_concerns", []):
-            draw_line(f"- {concern}", indent=10)
-
-        # Actions
-        draw_line("Recommended Actions:", bold=True)
-        for action in summary.get("recommended_actions", []):
-            draw_line(f"- {action}", indent=10)
-
-        # AI Summary
-        draw_line("AI Generated Summary Report:", bold=True)
-        summary_lines = summary.get("ai_summary", "").split("\n")
-        for line in summary_lines:
-            draw_line(line.strip(), indent=10)
-
-        c.save()
-        return output_path
+        """Save AI summary report to a PDF file (blocking; the API renders through ReportRenderQueue)"""
+        return render_summary_pdf(
+            summary, output_path,
+            max_items=settings.report_max_items, max_summary_chars=settings.report_max_summary_chars
+        )
 
     def _calculate_risk_level(self, severity_counts: Dict[str, int]) -> str:
         """Calculate overall risk level based on severity counts"""
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+class AnalysisCache:
+    """Frame analysis results keyed by image content hash and a prompt/model version tag.
+
+    A small in-process LRU sits in front of a SQLite table so repeated frames are
+    served from memory; entries expire after ttl_seconds and the table is trimmed
+    to max_entries by least recent access every evict_every writes. Disk hits
+    only record their access time in memory; it is written with the next put.
+    Calls block on SQLite, so async callers run them in a thread.
+    """
+
+    def __init__(self, db_path: str, version_tag: str, ttl_seconds: int = 86400,
+                 max_entries: int = 50000, memory_entries: int = 1024, evict_every: int = 100):
+        self.version_tag = version_tag
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+        self.evict_every = max(evict_every, 1)
+        self._memory = OrderedDict()
+        self._accessed: Dict[str, float] = {}
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS frame_analysis (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_frame_analysis_accessed ON frame_analysis (accessed_at)")
+        self._db.commit()
+
+    def key(self, image_bytes) -> str:
+        return f"{hashlib.sha256(image_bytes).hexdigest()}:{self.version_tag}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return entry[1]
+
+            row = self._db.execute(
+                "SELECT value, created_at FROM frame_analysis WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+
+            self._accessed[key] = now
+            value = json.loads(row[0])
+            self._remember(key, row[1], value)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO frame_analysis (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            self._accessed.pop(key, None)
+            if self._accessed:
+                self._db.executemany(
+                    "UPDATE frame_analysis SET accessed_at = ? WHERE key = ?",
+                    [(accessed_at, accessed_key) for accessed_key, accessed_at in self._accessed.items()]
+                )
+                self._accessed.clear()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.evict_every:
+                self._evict(now)
+                self._writes_since_evict = 0
+            self._db.commit()
+            self._remember(key, now, value)
+
+    def _remember(self, key: str, created_at: float, value: Dict[str, Any]):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now: float):
+        """Drop expired rows, then the least recently accessed ones beyond max_entries"""
+        self._db.execute("DELETE FROM frame_analysis WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM frame_analysis").fetchone()
+        if count > self.max_entries:
+            self._db.execute("""
+                DELETE FROM frame_analysis WHERE key IN (
+                    SELECT key FROM frame_analysis ORDER BY accessed_at LIMIT ?
+                )
+            """, (count - self.max_entries,))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM frame_analysis").fetchone()
+        return {
+            "version_tag": self.version_tag,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "memory_entries": len(self._memory)
+        }
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+from pathlib import Path
+from typing import Optional, Union
+
+class FrameHandle:
+    """An encoded frame kept in memory, optionally mirrored to a file on disk"""
+
+    def __init__(self, index: int, data: Union[bytes, memoryview], path: Optional[str] = None,
+                 mime_type: str = "image/jpeg"):
+        self.index = index
+        self._data = memoryview(data)
+        self.path = path
+        self.mime_type = mime_type
+
+    @classmethod
+    def encode(cls, frame: np.ndarray, index: int, ext: str = ".jpg", params: Optional[list] = None) -> "FrameHandle":
+        """Encode a decoded BGR frame without touching the filesystem"""
+        ok, encoded = cv2.imencode(ext, frame, params or [])
+        if not ok:
+            raise ValueError(f"Failed to encode frame {index} as {ext}")
+        mime_type = "image/webp" if ext == ".webp" else "image/jpeg"
+        # memoryview over the encoder's buffer avoids copying the bytes again
+        return cls(index, memoryview(encoded).cast("B"), mime_type=mime_type)
+
+    @classmethod
+    def from_path(cls, path: str, index: int) -> "FrameHandle":
+        """Load an already-written frame file"""
+        with open(path, "rb") as image_file:
+            return cls(index, image_file.read(), path=str(path))
+
+    @property
+    def view(self) -> memoryview:
+        return self._data
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes
+
+    def tobytes(self) -> bytes:
+        """Copy out the encoded bytes for APIs that require a bytes object"""
+        return self._data.tobytes()
+
+    def decode(self) -> np.ndarray:
+        """Decode back to a BGR frame"""
+        return cv2.imdecode(np.frombuffer(self._data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def write(self, path: Union[str, Path]) -> str:
+        """Write the encoded bytes to disk and remember the path"""
+        with open(path, "wb") as image_file:
+            image_file.write(self._data)
+        self.path = str(path)
+        return self.path
+
+
+def as_frame_handle(frame: Union["FrameHandle", str], index: int) -> FrameHandle:
+    """Accept either a FrameHandle or a path to a frame file"""
+    if isinstance(frame, FrameHandle):
+        return frame
+    return FrameHandle.from_path(frame, index)
@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from typing import Dict, Any, Tuple
+
+from services.frame_buffer import FrameHandle
+
+ENCODINGS = {
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY),
+}
+
+class FramePreprocessor:
+    """Downscales and re-encodes frames before they are sent to the model"""
+
+    def __init__(self, max_edge: int = 1024, image_format: str = "jpeg", quality: int = 80):
+        if image_format not in ENCODINGS:
+            raise ValueError(f"Unsupported frame format: {image_format}")
+        self.max_edge = max_edge
+        self.image_format = image_format
+        self.quality = quality
+
+    def prepare(self, frame: FrameHandle) -> Tuple[FrameHandle, Dict[str, Any]]:
+        """Return the frame to send and payload stats (bytes saved, scale applied).
+
+        The original handle is returned unchanged if re-encoding would not make it smaller.
+        """
+        original_bytes = frame.nbytes
+        image, decode_factor = self._decode(frame)
+        if image is None:
+            return frame, self._stats(original_bytes, original_bytes, 1.0)
+
+        height, width = image.shape[:2]
+        # Reduced decoding may already have shrunk the image; scale is relative to the source
+        source_long_edge = max(height, width) * decode_factor
+        long_edge = max(height, width)
+        if self.max_edge and long_edge > self.max_edge:
+            resize_ratio = self.max_edge / long_edge
+            image = cv2.resize(
+                image, (max(1, round(width * resize_ratio)), max(1, round(height * resize_ratio))),
+                interpolation=cv2.INTER_AREA
+            )
+        scale = max(image.shape[:2]) / source_long_edge
+
+        ext, quality_flag = ENCODINGS[self.image_format]
+        prepared = FrameHandle.encode(image, frame.index, ext=ext, params=[quality_flag, self.quality])
+        if prepared.nbytes >= original_bytes and scale == 1.0:
+            return frame, self._stats(original_bytes, original_bytes, 1.0)
+
+        prepared.path = frame.path
+        return prepared, self._stats(original_bytes, prepared.nbytes, scale)
+
+    def _decode(self, frame: FrameHandle) -> Tuple[np.ndarray, int]:
+        """Decode, letting libjpeg downscale by 2/4/8 while decoding when that still covers max_edge.
+
+        Returns (image, reduction factor applied during decoding).
+        """
+        buffer = np.frombuffer(frame.view, dtype=np.uint8)
+        if self.max_edge and frame.mime_type == "image/jpeg":
+            # A 1/8-scale grayscale decode is cheap and gives the source size
+            probe = cv2.imdecode(buffer, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+            if probe is not None:
+                approx_long_edge = max(probe.shape[:2]) * 8
+                for factor, reduced_flag in ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                                             (4, cv2.IMREAD_REDUCED_COLOR_4),
+                                             (2, cv2.IMREAD_REDUCED_COLOR_2)):
+                    if approx_long_edge // factor >= self.max_edge:
+                        return cv2.imdecode(buffer, reduced_flag), factor
+        return cv2.imdecode(buffer, cv2.IMREAD_COLOR), 1
+
+    def _stats(self, original_bytes: int, sent_bytes: int, scale: float) -> Dict[str, Any]:
+        return {
+            "original_bytes": original_bytes,
+            "sent_bytes": sent_bytes,
+            "bytes_saved": original_bytes - sent_bytes,
+            "scale": round(scale, 4)
+        }
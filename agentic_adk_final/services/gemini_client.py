@@ -0,0 +1,50 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from utils.config import settings
+
+class GeminiClient:
+    """Invokes a model's generate_content without tying up the default executor.
+
+    Models exposing generate_content_async (google.generativeai and the local stub)
+    are awaited natively, so in-flight calls cost no threads. Others run on a
+    dedicated executor, keeping network waits off the pool that decodes frames.
+    """
+
+    def __init__(self, use_async: bool = True, fallback_workers: int = 16):
+        self.use_async = use_async
+        self.fallback_workers = fallback_workers
+        self._executor = None
+        self.async_calls = 0
+        self.fallback_calls = 0
+
+    async def generate_content(self, model: Any, contents, **kwargs):
+        if self.use_async and hasattr(model, "generate_content_async"):
+            self.async_calls += 1
+            return await model.generate_content_async(contents, **kwargs)
+
+        self.fallback_calls += 1
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), lambda: model.generate_content(contents, **kwargs)
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.fallback_workers, thread_name_prefix="gemini-call"
+            )
+        return self._executor
+
+    def close(self):
+        """Shut down the fallback executor if it was started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+gemini_client = GeminiClient(
+    use_async=settings.gemini_async_enabled,
+    fallback_workers=settings.gemini_fallback_workers
+)
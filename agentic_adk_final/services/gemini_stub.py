@@ -0,0 +1,127 @@
+import asyncio
+import json
+import random
+import time
+from typing import Dict, Any, List, Optional
+
+from utils.config import settings
+
+DEFAULT_TEMPLATES = {
+    "frame": [
+        json.dumps({
+            "anomaly_detected": False,
+            "severity": "low",
+            "description": "Steady pedestrian flow, no safety concerns visible.",
+            "safety_concerns": [],
+            "recommended_actions": []
+        }),
+        json.dumps({
+            "anomaly_detected": True,
+            "severity": "medium",
+            "description": "Dense crowd forming near the exit.",
+            "safety_concerns": ["Crowd density rising near exit"],
+            "recommended_actions": ["Deploy stewards to the exit"],
+            "coordinates": {"x": 320, "y": 180}
+        }),
+    ],
+    "summary": [
+        "Overall the monitored area remained under control. Crowd density rose near one exit; "
+        "stewards should be deployed and exits kept clear."
+    ],
+    "incident": [
+        json.dumps({
+            "incident_type": "crowd",
+            "severity": "medium",
+            "affected_areas": ["Main concourse"],
+            "estimated_people_affected": "100-200",
+            "immediate_actions": ["Deploy emergency services"],
+            "preventive_measures": ["Improve crowd management"],
+            "stakeholders_to_notify": ["Local authorities"],
+            "summary": "Crowd build-up reported at the main concourse.",
+            "recommendations": ["Open additional exits"],
+            "confidence_level": "80%"
+        })
+    ],
+}
+
+class StubAPIError(Exception):
+    """Raised for the injected error fraction, like a 503 from the real API"""
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubGenerativeModel:
+    """Stand-in for genai.GenerativeModel that answers generate_content(_async) locally.
+
+    Latency is log-normal around latency_ms (plus latency_per_image_ms per image),
+    error_rate of calls raise StubAPIError, and responses are drawn from templates
+    keyed by request kind: frame, summary or incident. Batched frame requests are
+    answered with one frame template per image.
+    """
+
+    def __init__(self, model_name: str = "gemini-2.0-flash", latency_ms: float = 800,
+                 latency_sigma: float = 0.35, latency_per_image_ms: float = 150, error_rate: float = 0.0,
+                 templates: Optional[Dict[str, List[str]]] = None, seed: Optional[int] = None):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.latency_per_image_ms = latency_per_image_ms
+        self.error_rate = error_rate
+        self.templates = {**DEFAULT_TEMPLATES, **(templates or {})}
+        self._random = random.Random(seed)
+        self.calls = 0
+
+    def generate_content(self, contents, **kwargs) -> StubResponse:
+        seconds, images, prompt = self._plan(contents)
+        time.sleep(seconds)
+        return self._respond(images, prompt)
+
+    async def generate_content_async(self, contents, **kwargs) -> StubResponse:
+        seconds, images, prompt = self._plan(contents)
+        await asyncio.sleep(seconds)
+        return self._respond(images, prompt)
+
+    def _plan(self, contents):
+        """Return (latency in seconds, image count, prompt text) for a request"""
+        parts = contents if isinstance(contents, list) else [contents]
+        images = sum(1 for part in parts if isinstance(part, dict) and "mime_type" in part)
+        prompt = " ".join(part for part in parts if isinstance(part, str))
+        self.calls += 1
+        seconds = self.latency_ms / 1000 * self._random.lognormvariate(0, self.latency_sigma)
+        return seconds + images * self.latency_per_image_ms / 1000, images, prompt
+
+    def _respond(self, images: int, prompt: str) -> StubResponse:
+        if self._random.random() < self.error_rate:
+            raise StubAPIError("503 Service Unavailable (stub)")
+
+        if images > 1:
+            frames = [{"frame": i, **json.loads(self._pick("frame"))} for i in range(images)]
+            return StubResponse(json.dumps({"frames": frames}))
+        if images == 1:
+            return StubResponse(self._pick("frame"))
+        if "INCIDENT DETAILS" in prompt:
+            return StubResponse(self._pick("incident"))
+        return StubResponse(self._pick("summary"))
+
+    def _pick(self, kind: str) -> str:
+        return self._random.choice(self.templates[kind])
+
+
+def stub_model_from_settings(model_name: str) -> StubGenerativeModel:
+    """Build a stub model from the gemini_stub_* settings"""
+    templates = None
+    if settings.gemini_stub_templates_path:
+        with open(settings.gemini_stub_templates_path) as templates_file:
+            templates = json.load(templates_file)
+    return StubGenerativeModel(
+        model_name,
+        latency_ms=settings.gemini_stub_latency_ms,
+        latency_sigma=settings.gemini_stub_latency_sigma,
+        latency_per_image_ms=settings.gemini_stub_latency_per_image_ms,
+        error_rate=settings.gemini_stub_error_rate,
+        templates=templates,
+        seed=settings.gemini_stub_seed
+    )
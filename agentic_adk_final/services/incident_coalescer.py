@@ -0,0 +1,116 @@
+import asyncio
+import copy
+import re
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+def incident_key(incident: Dict[str, Any]) -> Tuple[str, str]:
+    """Normalized (location, incident type) used to spot reports of the same event"""
+    location = re.sub(r"[^\w\s]", " ", str(incident.get("location", "")).lower())
+    location = " ".join(location.split())
+    incident_type = str(incident.get("incident_type") or "general").strip().lower()
+    return location, incident_type
+
+
+class IncidentCoalescer:
+    """Single-flight incident analysis: duplicate reports share one run.
+
+    Reports with the same incident_key that arrive while an analysis is in flight,
+    or within window_seconds after it started, attach to it instead of starting
+    another. Failed analyses are not shared once they finish.
+    """
+
+    def __init__(self, window_seconds: float = 300, max_keys: int = 1024):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._flights: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self.analyses = 0
+        self.coalesced = 0
+
+    async def run(self, incident: Dict[str, Any],
+                  analyze: Callable[[Callable[[str], Awaitable[None]]], Awaitable[Dict[str, Any]]],
+                  progress: Optional[Callable[[str], Awaitable[None]]] = None, shared: Any = None,
+                  on_join: Optional[Callable[[Any], None]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return (analysis result, {"analysis_id", "coalesced"}) for an incident.
+
+        `analyze` is only called when no matching analysis can be shared. It is given a
+        progress callback that forwards each stage to the `progress` of every report
+        attached to the flight; late joiners first get the stages already reached.
+        `shared` is kept with a new flight, and a joining report's `on_join` is called
+        with the flight's `shared` value (e.g. to raise its scheduling priority).
+        Attached callers get their own copy of the result so incident records stay independent.
+        """
+        key = incident_key(incident)
+        flight = self._flights.get(key)
+        if flight is not None and self._shareable(flight):
+            self.coalesced += 1
+            flight["reports"] += 1
+            if on_join is not None:
+                on_join(flight["shared"])
+            await self._subscribe(flight, progress)
+            result = await asyncio.shield(flight["task"])
+            return copy.deepcopy(result), {"analysis_id": flight["analysis_id"], "coalesced": True}
+
+        flight = {
+            "analysis_id": uuid.uuid4().hex,
+            "started_at": time.monotonic(),
+            "reports": 1,
+            "stages": [],
+            "shared": shared,
+            "subscribers": [progress] if progress else []
+        }
+
+        async def publish(stage: str):
+            flight["stages"].append(stage)
+            for subscriber in list(flight["subscribers"]):
+                await subscriber(stage)
+
+        flight["task"] = asyncio.ensure_future(analyze(publish))
+        self._flights[key] = flight
+        self._flights.move_to_end(key)
+        self.analyses += 1
+        self._trim()
+        result = await asyncio.shield(flight["task"])
+        return result, {"analysis_id": flight["analysis_id"], "coalesced": False}
+
+    async def _subscribe(self, flight: Dict[str, Any], progress: Optional[Callable[[str], Awaitable[None]]]):
+        if progress is None:
+            return
+        # Stages can be published while replaying, so catch up until nothing is left
+        replayed = 0
+        while replayed < len(flight["stages"]):
+            await progress(flight["stages"][replayed])
+            replayed += 1
+        flight["subscribers"].append(progress)
+
+    def _shareable(self, flight: Dict[str, Any]) -> bool:
+        task = flight["task"]
+        if not task.done():
+            return True
+        if task.cancelled() or task.exception() is not None or _failed(task.result()):
+            return False
+        return time.monotonic() - flight["started_at"] <= self.window_seconds
+
+    def _trim(self):
+        # Drop expired flights first, then the oldest finished ones beyond max_keys
+        now = time.monotonic()
+        for key in [key for key, flight in self._flights.items()
+                    if flight["task"].done() and now - flight["started_at"] > self.window_seconds]:
+            del self._flights[key]
+        finished = [key for key, flight in self._flights.items() if flight["task"].done()]
+        for key in finished[:max(len(self._flights) - self.max_keys, 0)]:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "analyses": self.analyses,
+            "coalesced": self.coalesced,
+            "in_flight": sum(1 for flight in self._flights.values() if not flight["task"].done()),
+            "window_seconds": self.window_seconds
+        }
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("status") == "error"
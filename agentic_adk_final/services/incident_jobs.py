@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Set
+
+class IncidentJobRunner:
+    """Runs accepted incident pipelines as background tasks.
+
+    Jobs start as soon as they are submitted and wait for analysis capacity in the
+    IncidentScheduler, so the scheduler's priority order is the only queue: there
+    is no FIFO in front of it for a backlog to build up in. At most max_pending
+    jobs may be unfinished, so a surge of reports is rejected at intake instead of
+    growing memory without bound.
+    """
+
+    def __init__(self, max_pending: int = 500):
+        self.max_pending = max_pending
+        self._tasks: Set[asyncio.Task] = set()
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, job: Callable[[], Awaitable[Any]]) -> int:
+        """Start a job and return how many other jobs are unfinished.
+
+        Raises asyncio.QueueFull when max_pending jobs are already unfinished.
+        """
+        if len(self._tasks) >= self.max_pending:
+            raise asyncio.QueueFull()
+        pending = len(self._tasks)
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return pending
+
+    async def _run(self, job: Callable[[], Awaitable[Any]]):
+        try:
+            await job()
+            self.completed += 1
+        except Exception as e:
+            # Jobs record their own errors; this only keeps the failure visible
+            self.failed += 1
+            print(f"Incident job failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._tasks),
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_pending": self.max_pending
+        }
+
+    def close(self):
+        """Cancel unfinished jobs"""
+        for task in list(self._tasks):
+            task.cancel()
+        self._tasks.clear()
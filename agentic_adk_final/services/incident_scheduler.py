@@ -0,0 +1,159 @@
+import asyncio
+from collections import deque
+from typing import Any, Dict
+
+# Share of analysis capacity per priority level (5 is most urgent)
+PRIORITY_WEIGHTS = {5: 16.0, 4: 8.0, 3: 4.0, 2: 2.0, 1: 1.0}
+
+# Incident types that are never scheduled below a given level, whatever the reporter chose
+INCIDENT_TYPE_MIN_PRIORITY = {
+    "fire": 5,
+    "injury": 4,
+    "crime": 3,
+    "crowd": 2,
+    "general": 1
+}
+
+def incident_priority(incident: Dict[str, Any]) -> int:
+    """Scheduling level 1-5 from the reported priority and the incident type"""
+    incident_type = getattr(incident.get("incident_type"), "value", incident.get("incident_type")) or "general"
+    level = max(int(incident.get("priority") or 1), INCIDENT_TYPE_MIN_PRIORITY.get(str(incident_type).lower(), 1))
+    return min(max(level, min(PRIORITY_WEIGHTS)), max(PRIORITY_WEIGHTS))
+
+
+class IncidentScheduler:
+    """Caps concurrent incident analyses and orders waiters by weighted fair queueing.
+
+    Each waiter gets a virtual finish tag (self-clocked fair queueing), so under
+    contention level 5 gets 16 slots for every one at level 1 while no level is
+    shut out. Waiting ages a request: every aging_seconds in the queue takes one
+    level-1 share off its tag, so a stale report eventually overtakes new urgent ones.
+    Callers hold a ticket so a queued analysis can be raised to a higher level.
+    """
+
+    def __init__(self, max_concurrent: int = 4, aging_seconds: float = 30):
+        self.max_concurrent = max_concurrent
+        self.aging_seconds = aging_seconds
+        self.running = 0
+        self._queues = {level: deque() for level in PRIORITY_WEIGHTS}
+        self._last_finish = {level: 0.0 for level in PRIORITY_WEIGHTS}
+        self._virtual_time = 0.0
+        self._stats = {
+            level: {"granted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for level in PRIORITY_WEIGHTS
+        }
+
+    def ticket(self, level: int) -> Dict[str, Any]:
+        """A place in the scheduler for one analysis; its level can be raised while queued"""
+        return {"level": level, "entry": None}
+
+    async def acquire(self, ticket: Dict[str, Any]) -> float:
+        """Wait for an analysis slot and return the seconds spent queued.
+
+        Every successful acquire must be paired with release().
+        """
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        self._enqueue(ticket, loop.time(), future)
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the caller went away
+                self.release()
+            else:
+                future.cancel()
+            raise
+        finally:
+            ticket["entry"] = None
+
+    def raise_priority(self, ticket: Dict[str, Any], level: int):
+        """Move a ticket up to `level`, e.g. when an urgent report joins a shared analysis.
+
+        A queued ticket is re-tagged at the new level but keeps its arrival time, so
+        the wait it has already served still counts toward aging.
+        """
+        if level <= ticket["level"]:
+            return
+        old_level, ticket["level"] = ticket["level"], level
+        entry = ticket["entry"]
+        if entry is None or entry[2].done():
+            return
+        self._queues[old_level].remove(entry)
+        self._enqueue(ticket, entry[1], entry[2])
+        self._dispatch()
+
+    def release(self):
+        self.running -= 1
+        self._dispatch()
+
+    def _enqueue(self, ticket: Dict[str, Any], enqueued_at: float, future: asyncio.Future):
+        level = ticket["level"]
+        start = max(self._virtual_time, self._last_finish[level])
+        self._last_finish[level] = start + 1.0 / PRIORITY_WEIGHTS[level]
+        ticket["entry"] = (self._last_finish[level], enqueued_at, future)
+        self._queues[level].append(ticket["entry"])
+
+    def _dispatch(self):
+        """Grant free slots to the waiters with the lowest aged finish tags"""
+        loop = asyncio.get_event_loop()
+        while self.running < self.max_concurrent:
+            now = loop.time()
+            best = None
+            for level, queue in self._queues.items():
+                while queue and queue[0][2].done():
+                    queue.popleft()
+                # Raised tickets keep their arrival time, so any entry in a level may be the oldest
+                for entry in queue:
+                    finish, enqueued_at, future = entry
+                    if future.done():
+                        continue
+                    score = finish - (now - enqueued_at) / self.aging_seconds / PRIORITY_WEIGHTS[1]
+                    if best is None or score < best[0]:
+                        best = (score, level, entry)
+            if best is None:
+                return
+
+            _, level, entry = best
+            self._queues[level].remove(entry)
+            finish, enqueued_at, future = entry
+            self._virtual_time = max(self._virtual_time, finish)
+            self.running += 1
+            waited = now - enqueued_at
+            self._record_wait(level, waited)
+            future.set_result(round(waited, 4))
+
+    def queued_ahead(self, level: int) -> int:
+        """Waiting analyses at `level` or above, which a new request at `level` queues behind"""
+        return sum(
+            1 for queue_level, queue in self._queues.items() if queue_level >= level
+            for _, _, future in queue if not future.done()
+        )
+
+    def _record_wait(self, level: int, waited: float):
+        stats = self._stats[level]
+        stats["granted"] += 1
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Running analyses, queue depth and wait times per priority level"""
+        depth = {
+            f"priority_{level}": sum(1 for _, _, future in queue if not future.done())
+            for level, queue in self._queues.items()
+        }
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "wait_times": {
+                f"priority_{level}": {
+                    "granted": stats["granted"],
+                    "avg_wait_seconds": round(stats["total_wait_seconds"] / stats["granted"], 4) if stats["granted"] else 0.0,
+                    "max_wait_seconds": round(stats["max_wait_seconds"], 4)
+                }
+                for level, stats in self._stats.items()
+            }
+        }
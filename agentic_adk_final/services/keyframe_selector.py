@@ -0,0 +1,72 @@
+import cv2
+import numpy as np
+from typing import List, Dict, Any
+
+class KeyframeSelector:
+    """Drops sampled frames that are perceptual near-duplicates of frames already kept"""
+
+    def __init__(self, hash_size: int = 16, threshold: int = 6):
+        # threshold is the largest Hamming distance (out of hash_size**2 bits) treated as a duplicate
+        self.hash_size = hash_size
+        self.threshold = threshold
+
+    def compute_hashes(self, frames: List[np.ndarray]) -> np.ndarray:
+        """Compute difference hashes (dHash) for a batch of BGR frames.
+
+        Returns a boolean array of shape (n_frames, hash_size, hash_size).
+        """
+        if not frames:
+            return np.zeros((0, self.hash_size, self.hash_size), dtype=bool)
+
+        thumbnails = np.stack([
+            cv2.resize(
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame,
+                (self.hash_size + 1, self.hash_size),
+                interpolation=cv2.INTER_AREA
+            )
+            for frame in frames
+        ]).astype(np.int16)
+
+        return thumbnails[:, :, 1:] > thumbnails[:, :, :-1]
+
+    def select(self, frames: List[np.ndarray]) -> Dict[str, Any]:
+        """Keep frames whose hash differs from every kept frame by more than the threshold"""
+        hashes = self.compute_hashes(frames)
+        kept_indices: List[int] = []
+
+        for i in range(len(frames)):
+            if kept_indices:
+                distances = np.count_nonzero(hashes[kept_indices] != hashes[i], axis=(1, 2))
+                if distances.min() <= self.threshold:
+                    continue
+            kept_indices.append(i)
+
+        return {
+            "frames": [frames[i] for i in kept_indices],
+            "kept_indices": kept_indices,
+            "skipped": len(frames) - len(kept_indices)
+        }
+
+    def session(self) -> "KeyframeSession":
+        """Start incremental selection for frames that arrive one at a time"""
+        return KeyframeSession(self)
+
+
+class KeyframeSession:
+    """Remembers the hashes kept so far for a single streamed video"""
+
+    def __init__(self, selector: KeyframeSelector):
+        self.selector = selector
+        self.kept_hashes: List[np.ndarray] = []
+        self.skipped = 0
+
+    def offer(self, frame: np.ndarray) -> bool:
+        """Return True if the frame should be kept"""
+        frame_hash = self.selector.compute_hashes([frame])[0]
+        if self.kept_hashes:
+            distances = np.count_nonzero(np.stack(self.kept_hashes) != frame_hash, axis=(1, 2))
+            if distances.min() <= self.selector.threshold:
+                self.skipped += 1
+                return False
+        self.kept_hashes.append(frame_hash)
+        return True
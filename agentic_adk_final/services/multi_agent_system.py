@@ -1,12 +1,15 @@
 import asyncio
+import hashlib
 import os
+import time
+from collections import OrderedDict
 from typing import Dict, Any, List
 import json
 from datetime import datetime
 
 # Try to import Google ADK, fallback if not available
 try:
-    from google.adk.agents import Agent, LlmAgent, SequentialAgent
+    from google.adk.agents import Agent, LlmAgent, ParallelAgent, SequentialAgent
     from google.adk.tools import google_search
     ADK_AVAILABLE = True
 except ImportError:
@@ -22,16 +25,31 @@ except ImportError:
 
 import requests
 
+from services.agent_graph import AgentGraph, AgentNode
+from services.gemini_client import gemini_client
+from services.gemini_stub import stub_model_from_settings
+from services.rate_limiter import gemini_rate_limiter, estimate_tokens, PRIORITY_INCIDENT
+from utils.config import settings
+
+# Incidents whose agent results are kept for reuse
+INCIDENT_MEMO_SIZE = 256
+
 class MultiAgentIncidentManager:
     def __init__(self):
+        self.model = None
         # Configure Google AI if available
-        if GENAI_AVAILABLE:
+        if settings.gemini_stub_enabled:
+            self.model = stub_model_from_settings("gemini-2.0-flash")
+        elif GENAI_AVAILABLE:
             api_key = os.getenv("GOOGLE_API_KEY")
             if api_key:
                 genai.configure(api_key=api_key)
             else:
                 print("Warning: GOOGLE_API_KEY not found in environment variables")
         
+        self.agent_graph = self._build_agent_graph()
+        self._memos = OrderedDict()
+        
         # Initialize agents if ADK is available
         if ADK_AVAILABLE:
             self._setup_agents()
@@ -39,7 +57,7 @@ class MultiAgentIncidentManager:
             print("Using fallback multi-agent implementation")
         
     def _setup_agents(self):
-        """Setup the multi-agent system"""
+        """Setup the ADK agents for the nodes of the agent graph"""
         
         # Web Search Agent
         self.web_search_agent = LlmAgent(
@@ -113,14 +131,34 @@ class MultiAgentIncidentManager:
             output_key="incident_analysis"
         )
         
-        # Main coordination agent
-        self.coordinator_agent = SequentialAgent(
+        # ADK agent for each agent graph node, by node name
+        self.adk_agents = {
+            "web_search": self.web_search_agent,
+            "social_media": self.social_media_agent,
+            "summarizer": self.summarizer_agent
+        }
+        self.coordinator_agent = self._build_coordinator_agent()
+
+    def _build_coordinator_agent(self):
+        """Mirror the agent graph as ADK agents so the graph stays the one pipeline definition.
+
+        Each dependency stage becomes a ParallelAgent (or the agent itself when alone),
+        run in order by a SequentialAgent.
+        """
+        sub_agents = []
+        for position, stage in enumerate(self.agent_graph.stages()):
+            missing = [node.name for node in stage if node.name not in self.adk_agents]
+            if missing:
+                raise ValueError(f"No ADK agent defined for agent graph node(s): {', '.join(missing)}")
+            agents = [self.adk_agents[node.name] for node in stage]
+            sub_agents.append(agents[0] if len(agents) == 1 else ParallelAgent(
+                name=f"IncidentStage{position + 1}",
+                sub_agents=agents,
+                description="Agents that only need results of earlier stages, run concurrently"
+            ))
+        return SequentialAgent(
             name="IncidentCoordinator",
-            sub_agents=[
-                self.web_search_agent,
-                self.social_media_agent,
-                self.summarizer_agent
-            ],
+            sub_agents=sub_agents,
             description="Coordinates the multi-agent incident analysis process"
         )
 
@@ -182,26 +220,19 @@ class MultiAgentIncidentManager:
                 "search_keywords": self._generate_search_keywords(incident_data)
             }
             
-            # Run web search
-            web_results = await self._run_web_search(context)
-            
-            # Run social media monitoring
-            social_results = await self._run_social_monitoring(context)
-            
-            # Combine results and run summarizer
-            combined_data = {
-                **context,
-                "web_search_results": web_results,
-                "social_media_results": social_results
-            }
-            
-            summary_results = await self._run_summarizer(combined_data)
+            run = await self.agent_graph.run({"context": context}, memo=self._incident_memo(incident_data))
+            results = run["results"]
+            missing_sources = [name for name in run["failed"] if name != "summarizer"]
             
             return {
                 "status": "success",
-                "incident_analysis": summary_results,
-                "web_search_data": web_results,
-                "social_media_data": social_results,
+                "incident_analysis": results["incident_analysis"],
+                "web_search_data": results["web_search_results"],
+                "social_media_data": results["social_media_results"],
+                "partial": bool(missing_sources),
+                "missing_sources": missing_sources,
+                "memoized_agents": run["memoized"],
+                "timings": {f"{name}_seconds": seconds for name, seconds in run["timings"].items()},
                 "processing_timestamp": datetime.now().isoformat()
             }
             
@@ -213,6 +244,55 @@ class MultiAgentIncidentManager:
                 "processing_timestamp": datetime.now().isoformat()
             }
 
+    def _build_agent_graph(self) -> AgentGraph:
+        """Declare the incident agents and the results each one needs.
+
+        Agents that only need the incident context run in parallel; list a new
+        agent's output in the summarizer inputs to include it in the analysis.
+        """
+        return AgentGraph(
+            [
+                AgentNode("web_search", self._run_web_search, inputs=["context"], output="web_search_results"),
+                AgentNode("social_media", self._run_social_monitoring, inputs=["context"], output="social_media_results"),
+                AgentNode(
+                    "summarizer", self._summarize_sources,
+                    inputs=["context", "web_search_results", "social_media_results"], output="incident_analysis"
+                ),
+            ],
+            initial_inputs=["context"],
+            timeout=settings.emergency_response_timeout
+        )
+
+    def _incident_memo(self, incident_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Per-incident store of agent results, shared by repeated runs of the same incident.
+
+        Reports carry no id, so an identical payload arriving later is a new report of a
+        live situation: entries expire after incident_coalesce_window_seconds, the same
+        window in which duplicate reports share an analysis.
+        """
+        key = hashlib.sha256(json.dumps(incident_data, sort_keys=True, default=str).encode()).hexdigest()
+        now = time.monotonic()
+        created_at, memo = self._memos.pop(key, (now, {}))
+        if now - created_at > settings.incident_coalesce_window_seconds:
+            created_at, memo = now, {}
+        self._memos[key] = (created_at, memo)
+        while len(self._memos) > INCIDENT_MEMO_SIZE:
+            self._memos.popitem(last=False)
+        return memo
+
+    async def _summarize_sources(self, context: Dict[str, Any], **sources: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarizer node: combine whatever sources finished, flagging the missing ones"""
+        combined_data = {
+            **context,
+            **sources,
+            "missing_sources": [
+                name[:-len("_results")] if name.endswith("_results") else name
+                for name, results in sources.items()
+                if isinstance(results, dict) and results.get("status") in ("timeout", "error")
+            ]
+        }
+        return await self._run_summarizer(combined_data)
+
     async def _run_web_search(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Run web search agent"""
         try:
@@ -281,13 +361,15 @@ class MultiAgentIncidentManager:
             
             SOCIAL MEDIA MONITORING:
             {json.dumps(combined_data.get('social_media_results', {}), indent=2)}
-            
+            {self._additional_sources_section(combined_data)}
+            {self._missing_sources_note(combined_data.get('missing_sources', []))}
             Provide analysis in the specified JSON format.
             """
             
             # Use Gemini directly for summarization
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            response = await asyncio.to_thread(model.generate_content, prompt)
+            model = self.model or genai.GenerativeModel("gemini-2.0-flash")
+            await gemini_rate_limiter.acquire(PRIORITY_INCIDENT, tokens=estimate_tokens(prompt))
+            response = await gemini_client.generate_content(model, prompt)
             
             # Try to parse JSON response
             try:
@@ -317,6 +399,24 @@ class MultiAgentIncidentManager:
                 "severity": "unknown"
             }
 
+    def _additional_sources_section(self, combined_data: Dict[str, Any]) -> str:
+        """Prompt section for results of agents added to the graph beyond web search and social media"""
+        sections = [
+            f"{key[:-len('_results')].replace('_', ' ').upper()}:\n            {json.dumps(value, indent=2)}"
+            for key, value in combined_data.items()
+            if key.endswith("_results") and key not in ("web_search_results", "social_media_results")
+        ]
+        return "\n            ".join(sections)
+
+    def _missing_sources_note(self, missing_sources: List[str]) -> str:
+        """Prompt note telling the summarizer which sources are missing"""
+        if not missing_sources:
+            return ""
+        return (
+            f"\n            NOTE: No results from {', '.join(missing_sources)} (timed out or failed). "
+            "Base the assessment on the available data and lower the confidence level accordingly.\n"
+        )
+
     def _generate_search_keywords(self, incident_data: Dict[str, Any]) -> str:
         """Generate search keywords based on incident data"""
         keywords = []
@@ -0,0 +1,141 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any, Dict
+
+from utils.config import settings
+
+# Priority classes; lower values are served first
+PRIORITY_INCIDENT = 0
+PRIORITY_SUMMARY = 1
+PRIORITY_FRAME = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INCIDENT: "incident",
+    PRIORITY_SUMMARY: "summary",
+    PRIORITY_FRAME: "frame",
+}
+
+# Rough Gemini token cost of one image part
+IMAGE_TOKENS = 258
+
+def estimate_tokens(prompt: str, images: int = 0) -> int:
+    """Approximate request size: ~4 characters per text token plus a flat cost per image"""
+    return len(prompt) // 4 + images * IMAGE_TOKENS
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate` per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = None
+
+    def refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def seconds_until(self, amount: float) -> float:
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class GeminiRateLimiter:
+    """Process-wide async limiter with a requests/sec bucket, a tokens/min bucket and priority classes.
+
+    Waiters are served strictly by priority, then arrival order, so an incident
+    summary queued behind a burst of frame analyses is granted first.
+    """
+
+    def __init__(self, requests_per_second: float, burst_requests: int, tokens_per_minute: int):
+        self.request_bucket = TokenBucket(requests_per_second, burst_requests)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._stats = {
+            name: {"granted": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    async def acquire(self, priority: int = PRIORITY_FRAME, tokens: int = 1):
+        """Wait until a request of `tokens` estimated tokens may be sent"""
+        loop = asyncio.get_event_loop()
+        future = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), loop.time(), tokens, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Leave the slot for the next waiter
+            future.cancel()
+            self._dispatch()
+            raise
+
+    def _dispatch(self):
+        """Grant queued requests in priority order while both buckets have room"""
+        loop = asyncio.get_event_loop()
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        now = loop.time()
+        self.request_bucket.refill(now)
+        self.token_bucket.refill(now)
+
+        while self._queue:
+            priority, _, enqueued_at, tokens, future = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+
+            delay = max(self.request_bucket.seconds_until(1), self.token_bucket.seconds_until(tokens))
+            if delay > 0:
+                self._wakeup = loop.call_later(delay, self._dispatch)
+                return
+
+            heapq.heappop(self._queue)
+            self.request_bucket.take(1)
+            self.token_bucket.take(tokens)
+            future.set_result(None)
+            self._record_wait(priority, now - enqueued_at)
+
+    def _record_wait(self, priority: int, waited: float):
+        stats = self._stats[PRIORITY_NAMES.get(priority, "frame")]
+        stats["granted"] += 1
+        stats["total_wait_seconds"] += waited
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], waited)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and wait times per priority class"""
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _, _, future in self._queue:
+            if not future.done():
+                depth[PRIORITY_NAMES.get(priority, "frame")] += 1
+
+        return {
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "wait_times": {
+                name: {
+                    "granted": stats["granted"],
+                    "avg_wait_seconds": round(stats["total_wait_seconds"] / stats["granted"], 4) if stats["granted"] else 0.0,
+                    "max_wait_seconds": round(stats["max_wait_seconds"], 4)
+                }
+                for name, stats in self._stats.items()
+            },
+            "available_requests": round(self.request_bucket.tokens, 2),
+            "available_tokens": int(self.token_bucket.tokens)
+        }
+
+
+gemini_rate_limiter = GeminiRateLimiter(
+    requests_per_second=settings.gemini_requests_per_second,
+    burst_requests=settings.gemini_burst_requests,
+    tokens_per_minute=settings.gemini_tokens_per_minute
+)
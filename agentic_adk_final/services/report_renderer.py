@@ -0,0 +1,219 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+import textwrap
+
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+def render_summary_pdf(summary: Dict[str, Any], output_path: str,
+                       max_items: int = None, max_summary_chars: int = None) -> str:
+    """Render a summary report to a PDF file.
+
+    max_items caps each list section and max_summary_chars caps the AI summary
+    text, so huge analyses still render in bounded time.
+    """
+    c = canvas.Canvas(output_path, pagesize=A4)
+    width, height = A4
+    y = height - 50
+    left_margin = 50
+    right_margin = 50
+    max_line_width = width - left_margin - right_margin
+    wrappers = {}
+
+    def draw_line(text, font_size=12, bold=False, indent=0):
+        nonlocal y
+        if bold:
+            c.setFont("Helvetica-Bold", font_size)
+        else:
+            c.setFont("Helvetica", font_size)
+
+        # Wrap the text to fit the page
+        if font_size not in wrappers:
+            wrappers[font_size] = textwrap.TextWrapper(width=int(max_line_width // (font_size * 0.6)))
+        wrapped_lines = wrappers[font_size].wrap(text=str(text))
+
+        for wrapped_line in wrapped_lines:
+            if y < 60:
+                c.showPage()
+                y = height - 50
+                c.setFont("Helvetica-Bold" if bold else "Helvetica", font_size)
+            c.drawString(left_margin + indent, y, wrapped_line)
+            y -= font_size + 5
+
+    def draw_items(items):
+        shown = items[:max_items] if max_items else items
+        for item in shown:
+            draw_line(f"- {item}", indent=10)
+        if len(items) > len(shown):
+            draw_line(f"... and {len(items) - len(shown)} more", indent=10)
+
+    # Header
+    draw_line("Drone Surveillance Summary Report", font_size=16, bold=True)
+    draw_line(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    draw_line("")
+
+    # Summary stats
+    draw_line("Summary Statistics:", bold=True)
+    draw_line(f"Total Frames Analyzed: {summary.get('total_frames', '-')}", indent=10)
+    draw_line(f"Anomalies Detected: {summary.get('anomalies_detected', '-')}", indent=10)
+    draw_line(f"Risk Level: {summary.get('risk_level', '-')}", indent=10)
+
+    # Severity breakdown
+    draw_line("Severity Breakdown:", bold=True)
+    for level, count in summary.get("severity_breakdown", {}).items():
+        draw_line(f"{level.capitalize()}: {count}", indent=10)
+
+    # Safety concerns
+    draw_line("Identified Safety Concerns:", bold=True)
+    draw_items(list(summary.get("unique_concerns", [])))
+
+    # Actions
+    draw_line("Recommended Actions:", bold=True)
+    draw_items(list(summary.get("recommended_actions", [])))
+
+    # AI Summary
+    draw_line("AI Generated Summary Report:", bold=True)
+    ai_summary = summary.get("ai_summary", "")
+    if max_summary_chars and len(ai_summary) > max_summary_chars:
+        ai_summary = ai_summary[:max_summary_chars] + "\n[Summary truncated]"
+    for line in ai_summary.split("\n"):
+        draw_line(line.strip(), indent=10)
+
+    c.save()
+    return output_path
+
+
+class ReportRenderQueue:
+    """Renders summary PDFs on a worker process pool, one file per report.
+
+    Jobs move from queued to rendering to ready (or error). A job stays queued
+    until a pool worker is free, and timeout_seconds only counts rendering time.
+    Only the most recent max_jobs reports are kept; older finished ones are
+    deleted with their files.
+    """
+
+    def __init__(self, reports_dir: str = "temp/reports", max_workers: int = 2, timeout_seconds: float = 60,
+                 max_items: int = 100, max_summary_chars: int = 20000, max_jobs: int = 200):
+        self.reports_dir = Path(reports_dir)
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.max_items = max_items
+        self.max_summary_chars = max_summary_chars
+        self.max_jobs = max_jobs
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pool = None
+        # One slot per pool worker, so a job only starts its timeout once a worker is free
+        self._slots = None
+
+    def submit(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a report for rendering and return its status without waiting"""
+        report_id = uuid.uuid4().hex
+        self.jobs[report_id] = {
+            "report_id": report_id,
+            "status": "queued",
+            "created_at": time.time(),
+            "completed_at": None,
+            "error": None,
+            "path": str(self.reports_dir / f"report_{report_id}.pdf")
+        }
+        self._tasks[report_id] = asyncio.create_task(self._render(report_id, summary))
+        self._trim()
+        return self.status(report_id)
+
+    def status(self, report_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(report_id)
+        if job is None:
+            return None
+        return {
+            "report_id": report_id,
+            "status": job["status"],
+            "error": job["error"],
+            "created_at": datetime.fromtimestamp(job["created_at"]).isoformat(),
+            "completed_at": datetime.fromtimestamp(job["completed_at"]).isoformat() if job["completed_at"] else None,
+            "status_url": f"/api/reports/{report_id}",
+            "download_url": f"/api/reports/{report_id}/download"
+        }
+
+    async def wait(self, report_id: str) -> Optional[Dict[str, Any]]:
+        """Wait for a queued or rendering report to finish and return its status"""
+        task = self._tasks.get(report_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.status(report_id)
+
+    def path(self, report_id: str) -> Optional[str]:
+        job = self.jobs.get(report_id)
+        return job["path"] if job and job["status"] == "ready" else None
+
+    async def _render(self, report_id: str, summary: Dict[str, Any]):
+        job = self.jobs[report_id]
+        loop = asyncio.get_event_loop()
+        slots = self._get_slots()
+        acquired = False
+        render = None
+        try:
+            await slots.acquire()
+            acquired = True
+            job["status"] = "rendering"
+            render = loop.run_in_executor(
+                self._get_pool(), render_summary_pdf, summary, job["path"],
+                self.max_items, self.max_summary_chars
+            )
+            # Shielded so a timed-out render is left to finish in its worker
+            await asyncio.wait_for(asyncio.shield(render), timeout=self.timeout_seconds)
+            job["status"] = "ready"
+        except asyncio.TimeoutError:
+            job["status"] = "error"
+            job["error"] = f"Rendering took longer than {self.timeout_seconds} seconds"
+        except Exception as e:
+            job["status"] = "error"
+            job["error"] = str(e)
+        finally:
+            job["completed_at"] = time.time()
+            self._tasks.pop(report_id, None)
+            if render is not None:
+                # The worker stays busy until the render really ends, timed out or not
+                render.add_done_callback(lambda _: slots.release())
+            elif acquired:
+                slots.release()
+
+    def _trim(self):
+        finished = [report_id for report_id, job in self.jobs.items() if job["status"] in ("ready", "error")]
+        excess = len(self.jobs) - self.max_jobs
+        # Jobs are kept in submission order, so the first finished ones are the oldest
+        for report_id in finished[:max(excess, 0)]:
+            job = self.jobs.pop(report_id)
+            if os.path.exists(job["path"]):
+                os.remove(job["path"])
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        return self._slots
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the render pool; reportlab holds the GIL, so it runs out of process"""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def close(self):
+        """Shut down the render pool if it was started"""
+        for task in self._tasks.values():
+            task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._slots = None
@@ -0,0 +1,231 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from services.frame_buffer import FrameHandle
+from utils.config import settings
+
+class FrameRingBuffer:
+    """Fixed-size buffer of the most recent frames; the oldest frame is dropped when full
+
+    Workers push downscaled JPEG FrameHandles, so a full buffer costs a few MB per camera.
+    """
+
+    def __init__(self, capacity: int):
+        self._frames = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.total = 0
+
+    def push(self, frame: FrameHandle, timestamp: float):
+        with self._lock:
+            if len(self._frames) == self._frames.maxlen:
+                self.dropped += 1
+            self._frames.append((timestamp, frame))
+            self.total += 1
+
+    def latest(self) -> Optional[tuple]:
+        """Return (timestamp, frame) for the newest frame, or None"""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def snapshot(self) -> List[tuple]:
+        """Return all buffered (timestamp, frame) pairs, oldest first"""
+        with self._lock:
+            return list(self._frames)
+
+    def __len__(self):
+        return len(self._frames)
+
+
+class CameraStreamWorker:
+    """Decodes one camera stream into a ring buffer and reconnects when the stream drops"""
+
+    def __init__(self, camera_id: str, stream_url: str, executor: ThreadPoolExecutor):
+        self.camera_id = camera_id
+        self.stream_url = stream_url
+        self.buffer = FrameRingBuffer(settings.stream_buffer_frames)
+        self.status = "stopped"
+        self.reconnects = 0
+        self.last_error = None
+        self.last_frame_at = None
+        self.motion_level = None
+        self._executor = executor
+        self._stop = threading.Event()
+        self._task = None
+        # Local files stand in for live streams, so they are paced at their native frame rate
+        self._is_local = os.path.exists(stream_url)
+
+    def reject(self, reason: str):
+        """Register the camera without decoding it, so the reason shows in stats"""
+        self.status = "rejected"
+        self.last_error = reason
+
+    def start(self):
+        self._stop.clear()
+        self._task = asyncio.create_task(self._supervise())
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.status = "stopped"
+
+    async def _supervise(self):
+        """Run the decode loop, reconnecting with exponential backoff after failures"""
+        loop = asyncio.get_event_loop()
+        backoff = settings.stream_reconnect_initial_seconds
+        while not self._stop.is_set():
+            self.status = "connecting"
+            frames_before = self.buffer.total
+            try:
+                await loop.run_in_executor(self._executor, self._decode_loop)
+            except Exception as e:
+                self.last_error = str(e)
+
+            if self._stop.is_set():
+                break
+
+            # A connection that produced frames starts the backoff over
+            if self.buffer.total > frames_before:
+                backoff = settings.stream_reconnect_initial_seconds
+            self.status = "reconnecting"
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, settings.stream_reconnect_max_seconds)
+
+    def _decode_loop(self):
+        """Blocking read loop; returns when the stream ends or fails"""
+        cap = cv2.VideoCapture(self.stream_url)
+        try:
+            if not cap.isOpened():
+                raise ConnectionError(f"Could not open stream {self.stream_url}")
+            self.status = "streaming"
+
+            source_fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            keep_every = max(int(round(source_fps / settings.stream_sample_fps)), 1)
+            subtractor = cv2.createBackgroundSubtractorMOG2(history=200, detectShadows=False)
+            frame_interval = 1.0 / source_fps
+            next_frame_at = time.monotonic()
+            frame_idx = 0
+
+            while not self._stop.is_set():
+                # grab() every frame to stay live, but only decode the ones we keep
+                if not cap.grab():
+                    raise ConnectionError("Stream ended")
+                if self._is_local:
+                    next_frame_at += frame_interval
+                    delay = next_frame_at - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+                if frame_idx % keep_every == 0:
+                    ret, frame = cap.retrieve()
+                    if not ret:
+                        raise ConnectionError("Failed to decode frame")
+                    now = time.time()
+                    self.buffer.push(self._encode_buffered(frame, frame_idx), now)
+                    self.last_frame_at = now
+                    self.motion_level = self._estimate_motion(subtractor, frame)
+                frame_idx += 1
+        finally:
+            cap.release()
+
+    def _encode_buffered(self, frame: np.ndarray, index: int) -> FrameHandle:
+        """Downscale to stream_buffer_max_edge and JPEG-encode a frame for the ring buffer"""
+        height, width = frame.shape[:2]
+        long_edge = max(height, width)
+        max_edge = settings.stream_buffer_max_edge
+        if max_edge and long_edge > max_edge:
+            ratio = max_edge / long_edge
+            frame = cv2.resize(
+                frame, (max(1, round(width * ratio)), max(1, round(height * ratio))), interpolation=cv2.INTER_AREA
+            )
+        return FrameHandle.encode(frame, index, params=[cv2.IMWRITE_JPEG_QUALITY, settings.stream_buffer_jpeg_quality])
+
+    def _estimate_motion(self, subtractor, frame: np.ndarray) -> float:
+        """Foreground pixel ratio of a downscaled frame.
+
+        This measures movement, not occupancy: a dense crowd standing still is absorbed
+        into the background model and reads near 0, so it is not a crowd density.
+        """
+        small = cv2.resize(frame, (160, 90), interpolation=cv2.INTER_AREA)
+        mask = subtractor.apply(small)
+        return float(np.count_nonzero(mask)) / mask.size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "camera_id": self.camera_id,
+            "stream_url": self.stream_url,
+            "status": self.status,
+            "buffered_frames": len(self.buffer),
+            "frames_received": self.buffer.total,
+            "frames_dropped": self.buffer.dropped,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+            "last_frame": datetime.fromtimestamp(self.last_frame_at).isoformat() if self.last_frame_at else None,
+            "motion_level": round(self.motion_level, 3) if self.motion_level is not None else None
+        }
+
+
+class StreamIngestionManager:
+    """Owns one supervised decoder worker per camera"""
+
+    def __init__(self):
+        self.workers: Dict[str, CameraStreamWorker] = {}
+        self._executor = None
+
+    def start_camera(self, camera_id: str, stream_url: str) -> CameraStreamWorker:
+        """Start decoding a camera; beyond stream_max_workers the camera is reported as rejected"""
+        if camera_id in self.workers:
+            return self.workers[camera_id]
+        if self.active_count() >= settings.stream_max_workers:
+            # Each decode loop holds an executor thread for the life of the stream,
+            # so an extra camera would sit in the executor queue forever
+            worker = CameraStreamWorker(camera_id, stream_url, self._executor)
+            worker.reject(f"No free decoder thread (stream_max_workers={settings.stream_max_workers})")
+            self.workers[camera_id] = worker
+            print(f"⚠️ Stream for camera {camera_id} rejected: {worker.last_error}")
+            return worker
+        if self._executor is None:
+            # Decode loops block for the life of the stream, so they get their own threads
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.stream_max_workers, thread_name_prefix="stream-decoder"
+            )
+        worker = CameraStreamWorker(camera_id, stream_url, self._executor)
+        self.workers[camera_id] = worker
+        worker.start()
+        return worker
+
+    async def stop_camera(self, camera_id: str):
+        worker = self.workers.pop(camera_id, None)
+        if worker is not None:
+            await worker.stop()
+
+    async def stop_all(self):
+        for camera_id in list(self.workers):
+            await self.stop_camera(camera_id)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def active_count(self) -> int:
+        return sum(1 for worker in self.workers.values() if worker.status != "rejected")
+
+    def get_worker(self, camera_id: str) -> Optional[CameraStreamWorker]:
+        return self.workers.get(camera_id)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [worker.stats() for worker in self.workers.values()]
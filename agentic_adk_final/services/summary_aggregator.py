@@ -0,0 +1,58 @@
+from typing import List, Dict, Any, Optional
+
+class SummaryAggregator:
+    """Running totals for one analysis job, updated as each frame result arrives.
+
+    Concerns and actions are de-duplicated in first-seen order. The last summary
+    generated from these totals is kept so asking again without new frames is free.
+    """
+
+    def __init__(self):
+        self.total_frames = 0
+        self.anomalies_detected = 0
+        self.severity_counts: Dict[str, int] = {}
+        self._concerns: Dict[str, None] = {}
+        self._actions: Dict[str, None] = {}
+        self.version = 0
+        self._summary: Optional[Dict[str, Any]] = None
+        self._summary_version = -1
+
+    @classmethod
+    def from_results(cls, analysis_results: List[Dict[str, Any]]) -> "SummaryAggregator":
+        aggregator = cls()
+        for result in analysis_results:
+            aggregator.add(result)
+        return aggregator
+
+    def add(self, result: Dict[str, Any]):
+        self.total_frames += 1
+        self.version += 1
+        if not result.get("anomaly_detected", False):
+            return
+        self.anomalies_detected += 1
+        if result.get("status") != "success":
+            return
+
+        analysis = result.get("analysis", {})
+        severity = analysis.get("severity", "low")
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        for concern in analysis.get("safety_concerns", []):
+            self._concerns[str(concern)] = None
+        for action in analysis.get("recommended_actions", []):
+            self._actions[str(action)] = None
+
+    @property
+    def unique_concerns(self) -> List[str]:
+        return list(self._concerns)
+
+    @property
+    def recommended_actions(self) -> List[str]:
+        return list(self._actions)
+
+    def cached_summary(self) -> Optional[Dict[str, Any]]:
+        """The summary generated for the current totals, if there is one"""
+        return self._summary if self._summary_version == self.version else None
+
+    def remember_summary(self, summary: Dict[str, Any]):
+        self._summary = summary
+        self._summary_version = self.version
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from services.frame_buffer import FrameHandle
+
+# Query parameters that never change which video is served
+TRACKING_PARAMS = {"si", "feature", "pp", "t", "start"}
+YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com"}
+
+def normalize_url(url: str) -> str:
+    """Normalize a video URL so equivalent links share one cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    host = parts.netloc.lower()
+    path = parts.path.rstrip("/") or "/"
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k not in TRACKING_PARAMS and not k.startswith("utm_")]
+
+    # youtu.be/<id> and /shorts/<id> are the same video as watch?v=<id>
+    if host == "youtu.be":
+        host, query, path = "www.youtube.com", [("v", path.lstrip("/"))], "/watch"
+    elif host in YOUTUBE_HOSTS:
+        host = "www.youtube.com"
+        if path.startswith("/shorts/"):
+            query, path = [("v", path.split("/")[2])], "/watch"
+        elif path == "/watch":
+            query = [(k, v) for k, v in query if k == "v"]
+
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ""))
+
+
+class VideoCache:
+    """Disk cache for downloaded videos and extracted frame sets with TTL and LRU eviction
+
+    Methods touch the filesystem, so async callers run them in an executor.
+    Videos handed out by get_video/put_video are held until release() and
+    are never evicted while held.
+    """
+
+    def __init__(self, cache_dir: str = "temp/cache", max_size_mb: int = 2048, ttl_seconds: int = 86400):
+        self.videos_dir = Path(cache_dir) / "videos"
+        self.frames_dir = Path(cache_dir) / "frames"
+        self.videos_dir.mkdir(parents=True, exist_ok=True)
+        self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.ttl_seconds = ttl_seconds
+        self._in_use: Dict[Path, int] = {}
+        # Guards _in_use and eviction, which run on executor threads
+        self._lock = threading.Lock()
+
+    def video_key(self, url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def frames_key(self, url: str, **sampling_params) -> str:
+        payload = json.dumps({"url": normalize_url(url), **sampling_params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def video_path(self, url: str) -> Path:
+        return self.videos_dir / f"{self.video_key(url)}.mp4"
+
+    def get_video(self, url: str) -> Optional[str]:
+        """Return the cached video path held for the caller, or None on a miss"""
+        path = self.video_path(url)
+        with self._lock:
+            if not self._is_fresh(path):
+                return None
+            self._in_use[path] = self._in_use.get(path, 0) + 1
+        self._touch(path)
+        return str(path)
+
+    def put_video(self, url: str, downloaded_path: str) -> str:
+        """Move a finished download into the cache and return its cached path held for the caller"""
+        path = self.video_path(url)
+        with self._lock:
+            self._in_use[path] = self._in_use.get(path, 0) + 1
+        try:
+            os.replace(downloaded_path, path)
+        except OSError:
+            self.release(str(path))
+            raise
+        self.evict()
+        return str(path)
+
+    def release(self, video_path: str):
+        """Let a video returned by get_video/put_video be evicted again"""
+        path = Path(video_path)
+        with self._lock:
+            remaining = self._in_use.get(path, 0) - 1
+            if remaining > 0:
+                self._in_use[path] = remaining
+            else:
+                self._in_use.pop(path, None)
+
+    def get_frames(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached frame handles and their extraction metadata, or None on a miss"""
+        entry_dir = self.frames_dir / key
+        manifest_path = entry_dir / "manifest.json"
+        if not self._is_fresh(manifest_path):
+            return None
+        try:
+            with open(manifest_path) as manifest_file:
+                manifest = json.load(manifest_file)
+            frames = [
+                FrameHandle.from_path(str(entry_dir / name), index)
+                for index, name in enumerate(manifest["frames"])
+            ]
+        except (OSError, ValueError, KeyError):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+        self._touch(manifest_path)
+        return {"frames": frames, "metadata": manifest.get("metadata", {})}
+
+    def put_frames(self, key: str, frames: List[FrameHandle], metadata: Dict[str, Any]):
+        """Store encoded frames under the key; handles keep pointing at their own paths"""
+        entry_dir = self.frames_dir / key
+        tmp_dir = self.frames_dir / f".{key}.{os.getpid()}.{time.monotonic_ns()}"
+        tmp_dir.mkdir(parents=True)
+        names = []
+        for frame in frames:
+            name = f"frame_{frame.index:06d}.jpg"
+            with open(tmp_dir / name, "wb") as image_file:
+                image_file.write(frame.view)
+            names.append(name)
+        with open(tmp_dir / "manifest.json", "w") as manifest_file:
+            json.dump({"frames": names, "metadata": metadata}, manifest_file)
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # Another job stored the same key first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.evict(keep=entry_dir)
+
+    def evict(self, keep: Optional[Path] = None):
+        """Drop expired entries, then least recently used ones until under the size limit.
+
+        keep protects an entry that was just written and is about to be read;
+        videos held by a caller are skipped as well.
+        """
+        with self._lock:
+            self._evict(keep)
+
+    def _evict(self, keep: Optional[Path]):
+        entries = []
+        now = time.time()
+        for path in self.videos_dir.glob("*.mp4"):
+            entries.append((path, path, path.stat().st_size))
+        for entry_dir in self.frames_dir.iterdir():
+            manifest_path = entry_dir / "manifest.json"
+            if entry_dir.name.startswith(".") or not manifest_path.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            entries.append((entry_dir, manifest_path, size))
+
+        live = []
+        for entry, stamp_path, size in entries:
+            last_used = stamp_path.stat().st_mtime
+            if now - last_used > self.ttl_seconds and entry != keep and entry not in self._in_use:
+                self._remove(entry)
+            else:
+                live.append((last_used, entry, size))
+
+        total = sum(size for _, _, size in live)
+        for _, entry, size in sorted(live, key=lambda item: item[0]):
+            if total <= self.max_size_bytes:
+                break
+            if entry == keep or entry in self._in_use:
+                continue
+            self._remove(entry)
+            total -= size
+
+    def _is_fresh(self, path: Path) -> bool:
+        return path.exists() and time.time() - path.stat().st_mtime <= self.ttl_seconds
+
+    def _touch(self, path: Path):
+        """Mark an entry as recently used"""
+        os.utime(path, None)
+
+    def _remove(self, entry: Path):
+        if entry.is_dir():
+            shutil.rmtree(entry, ignore_errors=True)
+        else:
+            entry.unlink(missing_ok=True)
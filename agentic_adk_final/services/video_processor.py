@@ -1,54 +1,128 @@
 import cv2
+import numpy as np
 import os
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Optional
 from pathlib import Path
 import tempfile
 import aiofiles
 from fastapi import UploadFile
 import subprocess
+import uuid
+import shutil
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from services.frame_buffer import FrameHandle
+from services.keyframe_selector import KeyframeSelector
+from services.video_cache import VideoCache
+from utils.config import settings
+
+# Sampling steps up to this many frames are decoded in one sequential pass
+SEQUENTIAL_MAX_STEP = 120
+# Clips this short are always decoded sequentially
+SEQUENTIAL_MAX_TOTAL_FRAMES = 300
+# Uploads are copied to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Chunk size when reading streamed JPEG frames from ffmpeg
+STREAM_READ_SIZE = 64 * 1024
+JPEG_EOI = b"\xff\xd9"
 
 class VideoProcessor:
     def __init__(self):
         self.frames_dir = Path("temp/frames")
         self.frames_dir.mkdir(parents=True, exist_ok=True)
+        self.keyframe_selector = KeyframeSelector(threshold=settings.keyframe_hash_threshold)
+        self._decode_pool = None
+        self.video_cache = None
+        if settings.video_cache_enabled:
+            self.video_cache = VideoCache(
+                cache_dir=settings.video_cache_dir,
+                max_size_mb=settings.video_cache_max_size_mb,
+                ttl_seconds=settings.video_cache_ttl_seconds
+            )
 
-    async def process_youtube_video(self, video_url: str) -> Dict[str, Any]:
-        """Process YouTube video and extract frames"""
+    async def process_youtube_video(self, video_url: str, save_frames: bool = False,
+                                    frame_seconds: float = None) -> Dict[str, Any]:
+        """Process YouTube video and extract frames
+
+        frame_seconds is the measured per-frame analysis time used to fit the
+        sampling plan inside settings.max_processing_time.
+        """
         try:
-            # Use yt-dlp to download video (more reliable than pytube)
-            temp_video_path = f"temp/video_{asyncio.get_event_loop().time()}.mp4"
-            
-            # Download video using yt-dlp
-            cmd = [
-                "yt-dlp",
-                "-f", "best[height<=720]",  # Limit quality for faster processing
-                "-o", temp_video_path,
-                video_url
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                raise Exception(f"Failed to download video: {stderr.decode()}")
+            loop = asyncio.get_event_loop()
+            started = loop.time()
+            deduplicate = settings.keyframe_dedup_enabled
+            frames_key = None
+            if self.video_cache is not None:
+                frames_key = self.video_cache.frames_key(
+                    video_url, frames_per_second=settings.frames_per_second,
+                    max_frames=settings.max_frames_per_video, time_budget=settings.max_processing_time,
+                    deduplicate=deduplicate, hash_threshold=self.keyframe_selector.threshold
+                )
+                # Cache reads and writes touch up to max_frames_per_video files, so they stay off the event loop
+                cached_frames = await loop.run_in_executor(None, self.video_cache.get_frames, frames_key)
+                # The plan depends on measured latency and the time left, so only reuse a set planned the same way
+                if cached_frames is not None and self._cached_plan_matches(
+                    cached_frames["metadata"], frame_seconds, settings.max_processing_time - (loop.time() - started)
+                ):
+                    frames = cached_frames["frames"]
+                    if save_frames:
+                        await loop.run_in_executor(None, self._save_job_frames, frames)
+                    return {
+                        "status": "success",
+                        "frames": frames,
+                        "total_frames": len(frames),
+                        "duplicate_frames_skipped": cached_frames["metadata"].get("duplicate_frames_skipped", 0),
+                        "sampling_plan": cached_frames["metadata"].get("sampling_plan"),
+                        "cache": "frames"
+                    }
+
+            cache_status = "miss"
+            temp_video_path = None
+            if self.video_cache is not None:
+                temp_video_path = await loop.run_in_executor(None, self.video_cache.get_video, video_url)
+            if temp_video_path is not None:
+                cache_status = "video"
+            else:
+                temp_video_path = await self._download_video(video_url)
+                if self.video_cache is not None:
+                    temp_video_path = await loop.run_in_executor(
+                        None, self.video_cache.put_video, video_url, temp_video_path
+                    )
             
             # Extract frames
-            frames = await self._extract_frames(temp_video_path,max_frames=10)
-            
-            # Cleanup
-            if os.path.exists(temp_video_path):
-                os.remove(temp_video_path)
+            try:
+                # Time spent downloading comes out of the analysis budget
+                extraction = await self._extract_frames(
+                    temp_video_path, deduplicate=deduplicate, save_frames=save_frames,
+                    frame_seconds=frame_seconds,
+                    time_budget=settings.max_processing_time - (loop.time() - started)
+                )
+            finally:
+                # Cleanup (cached videos are kept until evicted, which their hold prevents until now)
+                if self.video_cache is not None:
+                    self.video_cache.release(temp_video_path)
+                elif os.path.exists(temp_video_path):
+                    os.remove(temp_video_path)
+            frames = extraction["frames"]
+
+            if frames_key is not None:
+                await loop.run_in_executor(None, self.video_cache.put_frames, frames_key, frames, {
+                    "duplicate_frames_skipped": extraction["duplicate_frames_skipped"],
+                    "sampling_plan": extraction["sampling_plan"],
+                    "frames_planned": extraction["sampling_plan"]["frames_planned"],
+                    "duration": extraction["duration"]
+                })
             
             return {
                 "status": "success",
                 "frames": frames,
-                "total_frames": len(frames)
+                "total_frames": len(frames),
+                "duplicate_frames_skipped": extraction["duplicate_frames_skipped"],
+                "sampling_plan": extraction["sampling_plan"],
+                "cache": cache_status
             }
             
         except Exception as e:
@@ -58,25 +132,54 @@ class VideoProcessor:
                 "frames": []
             }
 
-    async def process_uploaded_video(self, video_file: UploadFile) -> Dict[str, Any]:
+    async def _download_video(self, video_url: str) -> str:
+        """Download a video with yt-dlp and return the local path"""
+        # Use yt-dlp to download video (more reliable than pytube)
+        temp_video_path = f"temp/video_{uuid.uuid4().hex}.mp4"
+        
+        # Download video using yt-dlp
+        cmd = [
+            "yt-dlp",
+            "-f", "best[height<=720]",  # Limit quality for faster processing
+            "-o", temp_video_path,
+            video_url
+        ]
+        
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        
+        stdout, stderr = await process.communicate()
+        
+        if process.returncode != 0:
+            if os.path.exists(temp_video_path):
+                os.remove(temp_video_path)
+            raise Exception(f"Failed to download video: {stderr.decode()}")
+
+        return temp_video_path
+
+    async def process_uploaded_video(self, video_file: UploadFile, save_frames: bool = False,
+                                     frame_seconds: float = None) -> Dict[str, Any]:
         """Process uploaded video file"""
+        temp_video_path = None
         try:
             # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
-                content = await video_file.read()
-                temp_file.write(content)
-                temp_video_path = temp_file.name
+            temp_video_path = await self._save_upload(video_file)
             
             # Extract frames
-            frames = await self._extract_frames(temp_video_path)
-            
-            # Cleanup
-            os.unlink(temp_video_path)
+            extraction = await self._extract_frames(
+                temp_video_path, save_frames=save_frames, frame_seconds=frame_seconds
+            )
+            frames = extraction["frames"]
             
             return {
                 "status": "success",
                 "frames": frames,
-                "total_frames": len(frames)
+                "total_frames": len(frames),
+                "duplicate_frames_skipped": extraction["duplicate_frames_skipped"],
+                "sampling_plan": extraction["sampling_plan"]
             }
             
         except Exception as e:
@@ -86,40 +189,334 @@ class VideoProcessor:
                 "frames": []
             }
 
-    async def _extract_frames(self, video_path: str, max_frames: int =3) -> List[str]:
-        """Extract only a limited number of evenly spaced frames"""
-        frames = []
+        finally:
+            # Cleanup
+            if temp_video_path and os.path.exists(temp_video_path):
+                os.unlink(temp_video_path)
 
-        def extract_sync():
-            cap = cv2.VideoCapture(video_path)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            if total_frames == 0:
-                return frames
+    async def _save_upload(self, video_file: UploadFile) -> str:
+        """Stream an upload to a temp file in fixed-size chunks, enforcing max_video_size_mb"""
+        max_bytes = settings.max_video_size_mb * 1024 * 1024
+        if video_file.size is not None and video_file.size > max_bytes:
+            raise ValueError(f"Video exceeds the {settings.max_video_size_mb} MB upload limit")
 
-            step = max(total_frames // max_frames, 1)
-            extracted_count = 0
+        fd, temp_video_path = tempfile.mkstemp(suffix=".mp4")
+        os.close(fd)
+        written = 0
+        try:
+            async with aiofiles.open(temp_video_path, "wb") as temp_file:
+                while True:
+                    chunk = await video_file.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise ValueError(f"Video exceeds the {settings.max_video_size_mb} MB upload limit")
+                    await temp_file.write(chunk)
+        except Exception:
+            os.unlink(temp_video_path)
+            raise
 
-            for frame_idx in range(0, total_frames, step):
-                if extracted_count >= max_frames:
-                    break
+        return temp_video_path
+
+    async def stream_frames(self, source: str, max_frames: int = None, deduplicate: bool = None,
+                            stats: Optional[Dict[str, Any]] = None,
+                            frame_seconds: float = None) -> AsyncIterator[FrameHandle]:
+        """Yield sampled frames as they are decoded, without waiting for a full download.
+
+        source is a URL (yt-dlp writes the video into a pipe that ffmpeg decodes) or a
+        local file path, which stands in for the remote source. Streaming stops after
+        the planned frame count or settings.max_processing_time seconds, whichever comes first.
+        stats, if given, is filled with the sampling plan, frame counts and whether the
+        deadline was hit.
+        """
+        if deduplicate is None:
+            deduplicate = settings.keyframe_dedup_enabled
+        if stats is None:
+            stats = {}
+        stats.update({"frames_streamed": 0, "duplicate_frames_skipped": 0, "deadline_reached": False})
+
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + settings.max_processing_time
+        is_local = os.path.exists(source)
 
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
-                if not ret:
+        # Spread the planned frames over the clip when its duration is known up front
+        duration = await self._probe_duration(source, is_local)
+        plan = self.plan_sampling(duration, frame_seconds=frame_seconds, max_frames=max_frames)
+        stats["sampling_plan"] = plan
+        max_frames = plan["frames_planned"]
+        sample_fps = max_frames / duration if duration else settings.frames_per_second
+
+        ffmpeg_cmd = [
+            "ffmpeg", "-loglevel", "error",
+            "-i", source if is_local else "pipe:0",
+            "-vf", f"fps={sample_fps:.6f}",
+            "-frames:v", str(max_frames),
+            "-q:v", "3",
+            "-f", "image2pipe", "-vcodec", "mjpeg", "pipe:1"
+        ]
+
+        downloader = None
+        if is_local:
+            decoder = await asyncio.create_subprocess_exec(
+                *ffmpeg_cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+        else:
+            read_fd, write_fd = os.pipe()
+            decoder = None
+            try:
+                downloader = await asyncio.create_subprocess_exec(
+                    "yt-dlp", "-f", "best[height<=720]", "-o", "-", source,
+                    stdout=write_fd, stderr=asyncio.subprocess.DEVNULL
+                )
+                decoder = await asyncio.create_subprocess_exec(
+                    *ffmpeg_cmd, stdin=read_fd, stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+            finally:
+                os.close(read_fd)
+                os.close(write_fd)
+                # ffmpeg failed to start; don't leave yt-dlp downloading into a dead pipe
+                if decoder is None and downloader is not None and downloader.returncode is None:
+                    downloader.kill()
+                    await downloader.wait()
+
+        session = self.keyframe_selector.session() if deduplicate else None
+        buffer = b""
+        frame_index = 0
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    stats["deadline_reached"] = True
                     break
+                try:
+                    chunk = await asyncio.wait_for(decoder.stdout.read(STREAM_READ_SIZE), timeout=remaining)
+                except asyncio.TimeoutError:
+                    stats["deadline_reached"] = True
+                    break
+                if not chunk:
+                    break
+
+                buffer += chunk
+                encoded_frames, buffer = _split_jpeg_stream(buffer)
+                for encoded in encoded_frames:
+                    stats["frames_streamed"] += 1
+                    handle = FrameHandle(frame_index, encoded)
+                    if session is not None:
+                        thumbnail = cv2.imdecode(
+                            np.frombuffer(encoded, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4
+                        )
+                        if not session.offer(thumbnail):
+                            stats["duplicate_frames_skipped"] = session.skipped
+                            continue
+                    frame_index += 1
+                    yield handle
+        finally:
+            for process in (decoder, downloader):
+                if process is not None and process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+    async def _probe_duration(self, source: str, is_local: bool) -> Optional[float]:
+        """Clip duration in seconds, or None if it cannot be determined cheaply"""
+        try:
+            if is_local:
+                loop = asyncio.get_event_loop()
+                total_frames, fps = await loop.run_in_executor(None, _probe_video, source)
+                return total_frames / fps if total_frames and fps else None
 
-                frame_filename = f"frame_{extracted_count:06d}.jpg"
-                frame_path = self.frames_dir / frame_filename
-                cv2.imwrite(str(frame_path), frame)
-                frames.append(str(frame_path))
-                extracted_count += 1
+            process = await asyncio.create_subprocess_exec(
+                "yt-dlp", "--skip-download", "--print", "duration", source,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+            )
+            stdout, _ = await process.communicate()
+            return float(stdout.decode().strip()) or None
+        except Exception:
+            return None
+
+    async def _extract_frames(self, video_path: str, max_frames: int = None, mode: str = "auto",
+                              deduplicate: bool = None, save_frames: bool = False,
+                              parallel: bool = None, frame_seconds: float = None,
+                              time_budget: float = None) -> Dict[str, Any]:
+        """Extract only a limited number of evenly spaced frames as in-memory JPEG handles
 
-            cap.release()
-            return frames
+        The frame count comes from plan_sampling: settings.frames_per_second over the
+        clip, capped by max_frames and by what fits in time_budget at frame_seconds each.
+
+        mode is "seek", "sequential" or "auto" (picked from clip length and sampling step).
+        Near-duplicate frames are dropped unless deduplicate is False.
+        save_frames also writes the frames to a per-job directory under temp/frames.
+        parallel splits long clips into time segments decoded in a process pool
+        (None decides from the clip duration).
+        """
+        if deduplicate is None:
+            deduplicate = settings.keyframe_dedup_enabled
 
-        # Run in thread pool
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, extract_sync)
+        total_frames, fps = await loop.run_in_executor(None, _probe_video, video_path)
+        duration = total_frames / fps if fps > 0 else None
+        plan = self.plan_sampling(duration, frame_seconds=frame_seconds, time_budget=time_budget,
+                                  max_frames=max_frames)
+        if total_frames == 0:
+            return {"frames": [], "duplicate_frames_skipped": 0, "sampling_plan": plan, "duration": duration}
+
+        max_frames = plan["frames_planned"]
+        step = max(total_frames // max_frames, 1)
+        frame_indices = list(range(0, total_frames, step))[:max_frames]
+        sampling_mode = mode if mode != "auto" else self._choose_sampling_mode(total_frames, step)
+
+        segments = [frame_indices]
+        if parallel or (parallel is None and self._should_decode_in_parallel(total_frames, fps)):
+            segments = self._split_segments(frame_indices, self._decode_workers())
+
+        if len(segments) > 1:
+            # One VideoCapture per segment; gather keeps segment order so frames merge in order
+            pool = self._get_decode_pool()
+            segment_frames = await asyncio.gather(*[
+                loop.run_in_executor(pool, _decode_segment, video_path, segment, sampling_mode)
+                for segment in segments
+            ])
+            decoded = [frame for segment in segment_frames for frame in segment]
+        else:
+            # Run in thread pool
+            decoded = await loop.run_in_executor(None, _decode_segment, video_path, frame_indices, sampling_mode)
+
+        extraction = await loop.run_in_executor(None, self._finalize_frames, decoded, deduplicate, save_frames)
+        extraction["sampling_plan"] = plan
+        extraction["duration"] = duration
+        return extraction
+
+    def _cached_plan_matches(self, metadata: Dict[str, Any], frame_seconds: float, time_budget: float) -> bool:
+        """Whether a cached frame set has the frame count a fresh plan would choose now"""
+        if "frames_planned" not in metadata:
+            return False
+        plan = self.plan_sampling(metadata.get("duration"), frame_seconds=frame_seconds, time_budget=time_budget)
+        return plan["frames_planned"] == metadata["frames_planned"]
+
+    def plan_sampling(self, duration: Optional[float], frame_seconds: float = None,
+                      time_budget: float = None, max_frames: int = None) -> Dict[str, Any]:
+        """Decide how many frames to sample so analysis finishes inside the time budget.
+
+        An explicit max_frames is used as the target; otherwise the target is
+        settings.frames_per_second over the clip, capped at settings.max_frames_per_video.
+        One frame's worth of time is held back for the summary call.
+        """
+        frame_seconds = frame_seconds or settings.default_frame_analysis_seconds
+        if time_budget is None:
+            time_budget = settings.max_processing_time
+
+        if max_frames:
+            target, limited_by = max_frames, "max_frames"
+        elif duration:
+            target = max(1, int(duration * settings.frames_per_second))
+            limited_by = "frames_per_second"
+            if target > settings.max_frames_per_video:
+                target, limited_by = settings.max_frames_per_video, "max_frames_per_video"
+        else:
+            target, limited_by = settings.max_frames_per_video, "max_frames_per_video"
+
+        budget_frames = max(1, int((time_budget - frame_seconds) // frame_seconds))
+        if budget_frames < target:
+            target, limited_by = budget_frames, "max_processing_time"
+
+        return {
+            "frames_planned": target,
+            "limited_by": limited_by,
+            "duration_seconds": round(duration, 2) if duration else None,
+            "target_fps": settings.frames_per_second,
+            "time_budget_seconds": round(time_budget, 2),
+            "estimated_frame_seconds": round(frame_seconds, 3),
+            "estimated_analysis_seconds": round(target * frame_seconds, 2)
+        }
+
+    def _finalize_frames(self, decoded: list, deduplicate: bool, save_frames: bool) -> Dict[str, Any]:
+        """Drop near-duplicates, encode to JPEG handles and optionally write a per-job directory"""
+        skipped = 0
+        if deduplicate:
+            selection = self.keyframe_selector.select(decoded)
+            decoded = selection["frames"]
+            skipped = selection["skipped"]
+
+        frames = [FrameHandle.encode(frame, extracted_count) for extracted_count, frame in enumerate(decoded)]
+        if save_frames:
+            self._save_job_frames(frames)
+
+        return {"frames": frames, "duplicate_frames_skipped": skipped}
+
+    def _save_job_frames(self, frames: List[FrameHandle]) -> Path:
+        """Write frames to a fresh per-job directory under temp/frames"""
+        job_dir = self.frames_dir / uuid.uuid4().hex
+        job_dir.mkdir(parents=True, exist_ok=True)
+        for frame in frames:
+            frame.write(job_dir / f"frame_{frame.index:06d}.jpg")
+        self._trim_job_frames(keep=job_dir)
+        return job_dir
+
+    def _trim_job_frames(self, keep: Path = None):
+        """Delete job directories older than saved_frames_ttl_seconds, then the oldest beyond saved_frames_max_jobs"""
+        now = time.time()
+        job_dirs = []
+        for entry in self.frames_dir.iterdir():
+            # Only per-job directories (uuid hex names) are managed here
+            if entry == keep or not entry.is_dir() or len(entry.name) != 32:
+                continue
+            try:
+                job_dirs.append((entry.stat().st_mtime, entry))
+            except FileNotFoundError:
+                continue
+        job_dirs.sort()
+
+        excess = len(job_dirs) + (1 if keep is not None else 0) - settings.saved_frames_max_jobs
+        for position, (modified, entry) in enumerate(job_dirs):
+            if position < excess or now - modified > settings.saved_frames_ttl_seconds:
+                shutil.rmtree(entry, ignore_errors=True)
+
+    def _choose_sampling_mode(self, total_frames: int, step: int) -> str:
+        """Pick the cheaper way to reach the sampled frames.
+
+        Every seek decodes from the previous keyframe, so it only pays off when
+        samples are far apart; dense sampling or short clips decode faster in one pass.
+        """
+        if total_frames <= SEQUENTIAL_MAX_TOTAL_FRAMES or step <= SEQUENTIAL_MAX_STEP:
+            return "sequential"
+        return "seek"
+
+    def _should_decode_in_parallel(self, total_frames: int, fps: float) -> bool:
+        """Only clips long enough to amortize process start-up and frame transfer are split"""
+        if self._decode_workers() < 2 or fps <= 0:
+            return False
+        return total_frames / fps >= settings.parallel_decode_min_seconds
+
+    def _decode_workers(self) -> int:
+        return settings.parallel_decode_workers or os.cpu_count() or 1
+
+    def _split_segments(self, frame_indices: List[int], segment_count: int) -> List[List[int]]:
+        """Split sampled indices into contiguous, in-order time segments"""
+        segment_count = max(1, min(segment_count, len(frame_indices)))
+        size, remainder = divmod(len(frame_indices), segment_count)
+        segments = []
+        start = 0
+        for i in range(segment_count):
+            end = start + size + (1 if i < remainder else 0)
+            segments.append(frame_indices[start:end])
+            start = end
+        return segments
+
+    def close(self):
+        """Shut down the segment decode pool if it was started"""
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown(wait=False, cancel_futures=True)
+            self._decode_pool = None
+
+    def _get_decode_pool(self) -> ProcessPoolExecutor:
+        """Lazily start the segment decode pool (spawned, since forking a threaded cv2 process can deadlock)"""
+        if self._decode_pool is None:
+            self._decode_pool = ProcessPoolExecutor(
+                max_workers=self._decode_workers(),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._decode_pool
 
 
 
@@ -146,3 +543,74 @@ class VideoProcessor:
             return output_path
 
         return None
+
+
+def _split_jpeg_stream(buffer: bytes):
+    """Split complete JPEG images off the front of an MJPEG byte stream.
+
+    Returns (complete images, leftover bytes). Entropy-coded JPEG data stuffs 0xFF
+    bytes, so the end-of-image marker only appears at the end of each image.
+    """
+    frames = []
+    start = 0
+    while True:
+        end = buffer.find(JPEG_EOI, start)
+        if end == -1:
+            break
+        frames.append(buffer[start:end + len(JPEG_EOI)])
+        start = end + len(JPEG_EOI)
+    return frames, buffer[start:]
+
+
+def _probe_video(video_path: str):
+    """Return (frame count, fps) of a video"""
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    return total_frames, fps
+
+
+def _decode_segment(video_path: str, frame_indices: List[int], sampling_mode: str) -> list:
+    """Decode the given frame indices with a dedicated VideoCapture.
+
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if sampling_mode == "sequential":
+            return list(_read_frames_sequential(cap, frame_indices))
+        return list(_read_frames_seek(cap, frame_indices))
+    finally:
+        cap.release()
+
+
+def _read_frames_seek(cap, frame_indices: List[int]):
+    """Seek to each sampled index and decode it"""
+    for frame_idx in frame_indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+
+
+def _read_frames_sequential(cap, frame_indices: List[int]):
+    """Decode the stream once in order, grabbing past frames that are not kept"""
+    if not frame_indices:
+        return
+    wanted = set(frame_indices)
+    first_idx, last_idx = frame_indices[0], frame_indices[-1]
+
+    # Segments after the first start with a single seek
+    if first_idx > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_idx)
+
+    for frame_idx in range(first_idx, last_idx + 1):
+        if not cap.grab():
+            break
+        if frame_idx in wanted:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            yield frame
@@ -0,0 +1,20 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+# Sample camera clips shipped with the dashboard, used as local stand-ins for remote sources
+VIDEOS_DIR = APP_DIR.parent / "drishti-ai-system" / "public" / "videos"
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+@pytest.fixture
+def app_tmpdir(tmp_path, monkeypatch):
+    """Run from a temp directory so services write temp/ and cache files there"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
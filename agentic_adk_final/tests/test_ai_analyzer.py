@@ -0,0 +1,112 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from services import ai_analyzer as ai_analyzer_module
+from services.ai_analyzer import AIAnalyzer
+from services.analysis_cache import AnalysisCache
+from services.frame_buffer import FrameHandle
+from utils.config import settings
+
+CALL_SECONDS = 0.2
+
+
+@pytest.fixture
+def analyzer(app_tmpdir, monkeypatch):
+    monkeypatch.setattr(settings, "gemini_stub_enabled", True)
+    monkeypatch.setattr(settings, "gemini_stub_latency_ms", CALL_SECONDS * 1000)
+    monkeypatch.setattr(settings, "gemini_stub_latency_sigma", 0)
+    monkeypatch.setattr(settings, "gemini_stub_latency_per_image_ms", 0)
+    monkeypatch.setattr(settings, "analysis_cache_enabled", False)
+    monkeypatch.setattr(settings, "prefilter_enabled", False)
+    return AIAnalyzer()
+
+
+def _frames(count: int):
+    frames = []
+    for index in range(count):
+        image = np.random.default_rng(index).integers(0, 255, (90, 160, 3), dtype=np.uint8)
+        frames.append(FrameHandle.encode(image, index))
+    return frames
+
+
+async def _arriving(frames):
+    for frame in frames:
+        await asyncio.sleep(0)
+        yield frame
+
+
+def test_frame_stream_is_analyzed_concurrently(analyzer):
+    async def run():
+        started = time.perf_counter()
+        results = [result async for result in analyzer.analyze_frame_stream(_arriving(_frames(8)), concurrency=4)]
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+
+    assert sorted(result["frame_index"] for result in results) == list(range(8))
+    assert all(result["status"] == "success" for result in results)
+    # Two waves of four calls, not eight sequential ones
+    assert elapsed < 8 * CALL_SECONDS * 0.6
+
+
+def test_frame_stream_reraises_source_errors(analyzer):
+    async def failing_source():
+        yield _frames(1)[0]
+        raise ConnectionError("stream dropped")
+
+    async def run():
+        return [result async for result in analyzer.analyze_frame_stream(failing_source())]
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run())
+
+
+def test_frame_latency_excludes_rate_limiter_wait(analyzer, monkeypatch):
+    async def slow_acquire(priority, tokens=1):
+        await asyncio.sleep(0.5)
+
+    monkeypatch.setattr(ai_analyzer_module.gemini_rate_limiter, "acquire", slow_acquire)
+
+    asyncio.run(analyzer.analyze_frames(_frames(2), concurrency=2, batch_size=1))
+
+    assert analyzer.frame_latency_ema == pytest.approx(CALL_SECONDS, abs=0.1)
+
+
+def test_only_parsed_frame_analyses_are_cached(analyzer, monkeypatch):
+    monkeypatch.setattr(settings, "analysis_cache_enabled", True)
+    analyzer = AIAnalyzer()
+    replies = ["The scene shows people in distress", '{"anomaly_detected": false, "severity": "low"}']
+    calls = []
+
+    async def generate(contents, tokens):
+        calls.append(tokens)
+        return SimpleNamespace(text=replies[min(len(calls), len(replies)) - 1]), CALL_SECONDS
+
+    monkeypatch.setattr(analyzer, "_generate_frame_content", generate)
+    frame = _frames(1)[0]
+
+    unparsed = asyncio.run(analyzer._analyze_single_frame(frame, 0))
+    parsed = asyncio.run(analyzer._analyze_single_frame(frame, 0))
+    cached = asyncio.run(analyzer._analyze_single_frame(frame, 0))
+
+    assert unparsed["anomaly_detected"] is True
+    assert "cached" not in parsed
+    assert cached["cached"] is True
+    assert len(calls) == 2
+
+
+def test_analysis_cache_trims_every_n_writes(app_tmpdir):
+    cache = AnalysisCache(str(app_tmpdir / "cache.db"), "v1", max_entries=2, evict_every=3)
+    for index in range(3):
+        cache.put(f"key{index}", {"index": index})
+        time.sleep(0.01)
+    assert cache.stats()["entries"] == 2
+
+    for index in range(3, 5):
+        cache.put(f"key{index}", {"index": index})
+    # Not trimmed again until the third write since the last trim
+    assert cache.stats()["entries"] == 4
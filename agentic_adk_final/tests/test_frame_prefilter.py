@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+import pytest
+
+from conftest import VIDEOS_DIR
+from services.frame_buffer import FrameHandle
+from services.frame_prefilter import FramePrefilter
+from utils.config import settings
+
+
+def _sampled_frames(camera_file: str, count: int = 30):
+    cap = cv2.VideoCapture(str(VIDEOS_DIR / camera_file))
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    step = max(total // count, 1)
+    frames = []
+    for frame_idx in range(total):
+        if not cap.grab():
+            break
+        if frame_idx % step == 0:
+            frames.append(cap.retrieve()[1])
+            if len(frames) == count:
+                break
+    cap.release()
+    return frames
+
+
+def _static_scene(camera_file: str, count: int = 8):
+    """The first frame of a clip repeated with sensor noise: a textured scene with nothing moving"""
+    background = _sampled_frames(camera_file, 1)[0]
+    rng = np.random.default_rng(0)
+    return [
+        FrameHandle.encode(np.clip(background + rng.normal(0, 4, background.shape), 0, 255).astype(np.uint8), index)
+        for index in range(count)
+    ]
+
+
+@pytest.mark.parametrize("camera_file", ["cam-3.mp4", "cam-4.mp4", "cam-6.mp4"])
+def test_static_background_without_foreground_is_dropped(camera_file):
+    prefilter = FramePrefilter(threshold=settings.prefilter_threshold)
+
+    scores = prefilter.score(_static_scene(camera_file))
+
+    assert not any(score["forwarded"] for score in scores)
+    # The scene is full of edges, which must not count as activity
+    assert all(score["components"]["edge_density"] > 0.05 for score in scores)
+
+
+@pytest.mark.parametrize("camera_file", ["cam-3.mp4", "cam-4.mp4", "cam-6.mp4"])
+def test_bundled_clips_with_activity_are_forwarded(camera_file):
+    prefilter = FramePrefilter(threshold=settings.prefilter_threshold)
+    frames = [FrameHandle.encode(frame, index) for index, frame in enumerate(_sampled_frames(camera_file))]
+
+    scores = prefilter.score(frames)
+
+    assert all(score["forwarded"] for score in scores)
+
+
+def test_session_drops_static_frames_after_the_first():
+    prefilter = FramePrefilter(threshold=settings.prefilter_threshold)
+    session = prefilter.session()
+
+    forwarded = [session.score(frame)["forwarded"] for frame in _static_scene("cam-4.mp4")]
+
+    # The first frame has no background yet and is judged on edges alone
+    assert forwarded[0] is True
+    assert not any(forwarded[1:])
+    assert session.skipped == len(forwarded) - 1
+
+
+def test_blank_frame_without_background_is_dropped():
+    prefilter = FramePrefilter(threshold=settings.prefilter_threshold)
+    blank = FrameHandle.encode(np.full((180, 320, 3), 128, dtype=np.uint8), 0)
+
+    assert prefilter.score([blank])[0]["forwarded"] is False
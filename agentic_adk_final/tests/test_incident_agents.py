@@ -0,0 +1,84 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from services import multi_agent_system
+from services.agent_graph import AgentGraph, AgentNode
+from services.multi_agent_system import MultiAgentIncidentManager
+from utils.config import settings
+
+INCIDENT = {"title": "Crowd build-up", "description": "Dense crowd", "location": "Central Station",
+            "incident_type": "crowd", "priority": 3}
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    monkeypatch.setattr(settings, "gemini_stub_enabled", True)
+    monkeypatch.setattr(settings, "gemini_stub_latency_ms", 20)
+    return MultiAgentIncidentManager()
+
+
+def test_repeated_report_reuses_agents_only_inside_the_window(manager, monkeypatch):
+    first = asyncio.run(manager.process_incident(INCIDENT))
+    repeat = asyncio.run(manager.process_incident(INCIDENT))
+    monkeypatch.setattr(settings, "incident_coalesce_window_seconds", 0)
+    later = asyncio.run(manager.process_incident(INCIDENT))
+
+    assert first["memoized_agents"] == []
+    assert repeat["memoized_agents"] == ["web_search", "social_media", "summarizer"]
+    assert later["memoized_agents"] == []
+
+
+def test_graph_runs_independent_agents_in_parallel_and_flags_timeouts():
+    async def slow(context):
+        await asyncio.sleep(0.2)
+        return {"status": "success"}
+
+    async def hang(context):
+        await asyncio.sleep(5)
+
+    async def combine(context, **sources):
+        return {"sources": sorted(sources)}
+
+    graph = AgentGraph([
+        AgentNode("a", slow, ["context"], "a_results"),
+        AgentNode("b", slow, ["context"], "b_results"),
+        AgentNode("stuck", hang, ["context"], "stuck_results", timeout=0.1),
+        AgentNode("summary", combine, ["context", "a_results", "b_results", "stuck_results"], "summary"),
+    ], initial_inputs=["context"])
+    memo = {}
+
+    run = asyncio.run(graph.run({"context": {}}, memo=memo))
+
+    assert run["failed"] == ["stuck"]
+    assert run["results"]["summary"] == {"sources": ["a_results", "b_results", "stuck_results"]}
+    assert run["timings"]["a"] < 0.35 and run["timings"]["b"] < 0.35
+    # The summary saw a failed input, so it is not kept for reuse
+    assert sorted(memo) == ["a", "b"]
+
+
+def test_graph_rejects_cycles():
+    async def agent(**inputs):
+        return {}
+
+    with pytest.raises(ValueError, match="cycle"):
+        AgentGraph([AgentNode("a", agent, ["b_out"], "a_out"), AgentNode("b", agent, ["a_out"], "b_out")], [])
+
+
+def test_adk_coordinator_is_built_from_the_graph_stages(manager, monkeypatch):
+    def agent(**kwargs):
+        return SimpleNamespace(**kwargs)
+
+    monkeypatch.setattr(multi_agent_system, "ParallelAgent", agent, raising=False)
+    monkeypatch.setattr(multi_agent_system, "SequentialAgent", agent, raising=False)
+    manager.adk_agents = {name: name for name in ("web_search", "social_media", "summarizer")}
+
+    coordinator = manager._build_coordinator_agent()
+
+    assert [[node.name for node in stage] for stage in manager.agent_graph.stages()] == [
+        ["web_search", "social_media"], ["summarizer"]
+    ]
+    parallel, summarizer = coordinator.sub_agents
+    assert parallel.sub_agents == ["web_search", "social_media"]
+    assert summarizer == "summarizer"
@@ -0,0 +1,63 @@
+import asyncio
+
+from services.incident_coalescer import IncidentCoalescer, incident_key
+
+
+def test_incident_key_normalizes_location_and_type():
+    assert incident_key({"location": "  Central   Station!", "incident_type": "Crowd"}) == \
+        incident_key({"location": "central station", "incident_type": "crowd"})
+    assert incident_key({"location": "Central Station"}) == ("central station", "general")
+
+
+def test_joined_reports_share_one_analysis_and_every_progress_stage():
+    coalescer = IncidentCoalescer(window_seconds=60)
+    calls = []
+    stages = {"first": [], "second": [], "third": []}
+
+    async def analyze(progress):
+        calls.append(1)
+        for stage in ("agents", "maps", "routing"):
+            await progress(stage)
+            await asyncio.sleep(0.05)
+        return {"status": "success", "summary": "shared"}
+
+    def recorder(name):
+        async def progress(stage):
+            stages[name].append(stage)
+        return progress
+
+    async def report(name, delay):
+        await asyncio.sleep(delay)
+        incident = {"location": "Central Station", "incident_type": "crowd", "description": name}
+        return await coalescer.run(incident, analyze, recorder(name))
+
+    async def run():
+        # second joins mid-flight, third after the flight finished but inside the window
+        return await asyncio.gather(report("first", 0), report("second", 0.07), report("third", 0.3))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert [flight["coalesced"] for _, flight in results] == [False, True, True]
+    assert len({flight["analysis_id"] for _, flight in results}) == 1
+    assert all(result == {"status": "success", "summary": "shared"} for result, _ in results)
+    assert stages == {name: ["agents", "maps", "routing"] for name in stages}
+
+
+def test_failed_analyses_are_not_shared_after_they_finish():
+    coalescer = IncidentCoalescer(window_seconds=60)
+    outcomes = iter([{"status": "error", "error": "boom"}, {"status": "success"}])
+
+    async def analyze(progress):
+        return next(outcomes)
+
+    incident = {"location": "Central Station", "incident_type": "crowd"}
+
+    async def run():
+        return await coalescer.run(incident, analyze), await coalescer.run(incident, analyze)
+
+    (first, _), (second, flight) = asyncio.run(run())
+
+    assert first["status"] == "error"
+    assert second["status"] == "success"
+    assert not flight["coalesced"]
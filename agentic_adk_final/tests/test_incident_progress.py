@@ -0,0 +1,44 @@
+import asyncio
+import importlib
+import json
+import time
+
+import pytest
+
+SEND_SECONDS = 0.3
+
+
+class SlowClient:
+    def __init__(self):
+        self.messages = []
+
+    async def send_text(self, message):
+        await asyncio.sleep(SEND_SECONDS)
+        self.messages.append(message)
+
+
+@pytest.fixture
+def main_module(app_tmpdir):
+    return importlib.import_module("main")
+
+
+def test_progress_does_not_wait_for_slow_websocket_clients(main_module, monkeypatch):
+    client = SlowClient()
+    monkeypatch.setattr(main_module.manager, "active_connections", [client])
+    incident = main_module.new_incident_record({"location": "Central Station", "incident_type": "crowd"})
+
+    async def run():
+        started = time.perf_counter()
+        for stage in ("agents", "maps", "routing"):
+            await main_module.publish_incident_progress(incident, stage)
+        published = time.perf_counter() - started
+        while len(client.messages) < 3:
+            await asyncio.sleep(0.05)
+        return published
+
+    published = asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert published < SEND_SECONDS
+    assert [stage["stage"] for stage in incident["processing_stages"]] == ["agents", "maps", "routing"]
+    # Delivered in order once the client catches up
+    assert [json.loads(message)["stage"] for message in client.messages] == ["agents", "maps", "routing"]
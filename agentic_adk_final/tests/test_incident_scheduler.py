@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from services.incident_jobs import IncidentJobRunner
+from services.incident_scheduler import IncidentScheduler, incident_priority
+
+
+def test_incident_priority_applies_the_incident_type_floor():
+    assert incident_priority({"priority": 1, "incident_type": "fire"}) == 5
+    assert incident_priority({"priority": 4, "incident_type": "general"}) == 4
+    assert incident_priority({"priority": 1, "incident_type": "crowd"}) == 2
+
+
+async def _serve(scheduler: IncidentScheduler, arrivals, raise_to=None):
+    """Queue (name, level) arrivals behind one running analysis and return the grant order"""
+    order, tickets = [], {}
+    blocker = scheduler.ticket(1)
+    await scheduler.acquire(blocker)
+
+    async def job(name, level):
+        tickets[name] = scheduler.ticket(level)
+        await scheduler.acquire(tickets[name])
+        order.append(name)
+        await asyncio.sleep(0.01)
+        scheduler.release()
+
+    tasks = []
+    for name, level in arrivals:
+        tasks.append(asyncio.create_task(job(name, level)))
+        await asyncio.sleep(0)
+    for name, level in raise_to or []:
+        scheduler.raise_priority(tickets[name], level)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_urgent_incidents_overtake_a_backlog_but_lower_levels_still_get_a_share():
+    scheduler = IncidentScheduler(max_concurrent=1, aging_seconds=60)
+    arrivals = [(f"general{i}", 1) for i in range(6)] + [(f"fire{i}", 5) for i in range(2)] + \
+        [(f"crowd{i}", 2) for i in range(3)]
+
+    order = asyncio.run(_serve(scheduler, arrivals))
+
+    assert order[:2] == ["fire0", "fire1"]
+    # Level 2 gets twice level 1's share, but level 1 is served before level 2 drains
+    assert order.index("crowd2") < order.index("general2")
+    assert order.index("general0") < order.index("crowd2")
+    stats = scheduler.stats()
+    assert stats["running"] == 0 and stats["queue_depth"] == 0
+    assert stats["wait_times"]["priority_5"]["granted"] == 2
+    assert stats["wait_times"]["priority_5"]["max_wait_seconds"] < stats["wait_times"]["priority_1"]["max_wait_seconds"]
+
+
+def test_aging_lets_old_reports_overtake_new_urgent_ones():
+    scheduler = IncidentScheduler(max_concurrent=1, aging_seconds=0.001)
+
+    async def run():
+        order = []
+        blocker = scheduler.ticket(1)
+        await scheduler.acquire(blocker)
+
+        async def job(name, level):
+            await scheduler.acquire(scheduler.ticket(level))
+            order.append(name)
+            scheduler.release()
+
+        old = asyncio.create_task(job("old general", 1))
+        await asyncio.sleep(0.05)
+        new = asyncio.create_task(job("new fire", 5))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(old, new)
+        return order
+
+    assert asyncio.run(run()) == ["old general", "new fire"]
+
+
+def test_raising_a_queued_ticket_moves_it_ahead_of_the_backlog():
+    scheduler = IncidentScheduler(max_concurrent=1, aging_seconds=60)
+    arrivals = [(f"general{i}", 1) for i in range(4)] + [("joined crowd", 2)]
+
+    order = asyncio.run(_serve(scheduler, arrivals, raise_to=[("joined crowd", 5)]))
+
+    assert order[0] == "joined crowd"
+    assert scheduler.stats()["wait_times"]["priority_5"]["granted"] == 1
+
+
+def test_cancelled_waiters_do_not_hold_a_slot():
+    scheduler = IncidentScheduler(max_concurrent=1)
+
+    async def run():
+        await scheduler.acquire(scheduler.ticket(1))
+        waiter = asyncio.create_task(scheduler.acquire(scheduler.ticket(5)))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        scheduler.release()
+        return scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert stats["running"] == 0
+    assert stats["queue_depth"] == 0
+
+
+def test_background_jobs_beyond_capacity_are_still_served_by_priority():
+    scheduler = IncidentScheduler(max_concurrent=1, aging_seconds=60)
+    jobs = IncidentJobRunner(max_pending=20)
+
+    async def run():
+        order = []
+
+        def job(name, level):
+            async def analyze():
+                await scheduler.acquire(scheduler.ticket(level))
+                order.append(name)
+                await asyncio.sleep(0.01)
+                scheduler.release()
+            return analyze
+
+        # Far more reports than analysis slots, then a fire
+        for i in range(8):
+            jobs.submit(job(f"general{i}", 1))
+        await asyncio.sleep(0)
+        jobs.submit(job("FIRE", 5))
+        queued_ahead_of_fire = scheduler.queued_ahead(5)
+        while jobs.stats()["pending"]:
+            await asyncio.sleep(0.01)
+        return order, queued_ahead_of_fire
+
+    order, queued_ahead_of_fire = asyncio.run(run())
+
+    # Only the analysis already running when it arrived goes before the fire
+    assert order[:2] == ["general0", "FIRE"]
+    assert queued_ahead_of_fire == 0
+    assert jobs.stats()["completed"] == 9
+
+
+def test_job_runner_rejects_reports_beyond_max_pending():
+    jobs = IncidentJobRunner(max_pending=2)
+
+    async def run():
+        release = asyncio.Event()
+        for _ in range(2):
+            jobs.submit(release.wait)
+        with pytest.raises(asyncio.QueueFull):
+            jobs.submit(release.wait)
+        release.set()
+        while jobs.stats()["pending"]:
+            await asyncio.sleep(0)
+        # Capacity frees up as jobs finish
+        jobs.submit(release.wait)
+        await asyncio.sleep(0)
+        return jobs.stats()
+
+    stats = asyncio.run(run())
+    assert stats["completed"] == 3
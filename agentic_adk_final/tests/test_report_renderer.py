@@ -0,0 +1,59 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services import report_renderer
+from services.report_renderer import ReportRenderQueue
+
+RENDER_SECONDS = 0.4
+
+
+def _slow_render(summary, output_path, max_items=None, max_summary_chars=None):
+    time.sleep(RENDER_SECONDS)
+    with open(output_path, "wb") as report_file:
+        report_file.write(b"%PDF-1.4")
+    return output_path
+
+
+def _queue(app_tmpdir, monkeypatch, timeout_seconds):
+    monkeypatch.setattr(report_renderer, "render_summary_pdf", _slow_render)
+    queue = ReportRenderQueue(reports_dir=str(app_tmpdir / "reports"), max_workers=1, timeout_seconds=timeout_seconds)
+    # Threads stand in for the spawned render processes so the patched renderer is used
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(queue, "_get_pool", lambda: pool)
+    return queue
+
+
+def test_time_waiting_for_a_worker_does_not_count_toward_the_timeout(app_tmpdir, monkeypatch):
+    queue = _queue(app_tmpdir, monkeypatch, timeout_seconds=RENDER_SECONDS * 1.5)
+
+    async def run():
+        first = queue.submit({})
+        second = queue.submit({})
+        await asyncio.sleep(RENDER_SECONDS / 4)
+        waiting = queue.status(second["report_id"])["status"]
+        return waiting, await queue.wait(first["report_id"]), await queue.wait(second["report_id"])
+
+    waiting, first, second = asyncio.run(run())
+
+    assert waiting == "queued"
+    assert first["status"] == "ready"
+    assert second["status"] == "ready"
+
+
+def test_timed_out_render_keeps_its_worker_until_it_ends(app_tmpdir, monkeypatch):
+    queue = _queue(app_tmpdir, monkeypatch, timeout_seconds=RENDER_SECONDS / 4)
+
+    async def run():
+        first = queue.submit({})
+        second = queue.submit({})
+        first_status = await queue.wait(first["report_id"])
+        # The first render is still running, so the second has not started its timeout
+        second_waiting = queue.status(second["report_id"])["status"]
+        return first_status, second_waiting, await queue.wait(second["report_id"])
+
+    first, second_waiting, second = asyncio.run(run())
+
+    assert first["status"] == "error"
+    assert second_waiting == "queued"
+    assert second["status"] == "error"
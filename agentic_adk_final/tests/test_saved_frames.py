@@ -0,0 +1,39 @@
+import os
+import time
+
+import numpy as np
+
+from services.frame_buffer import FrameHandle
+from services.video_processor import VideoProcessor
+from utils.config import settings
+
+
+def _frames(count=2):
+    return [FrameHandle.encode(np.zeros((8, 8, 3), dtype=np.uint8), index) for index in range(count)]
+
+
+def test_saved_job_directories_are_capped(app_tmpdir, monkeypatch):
+    monkeypatch.setattr(settings, "saved_frames_max_jobs", 3)
+    processor = VideoProcessor()
+
+    job_dirs = []
+    for _ in range(5):
+        job_dirs.append(processor._save_job_frames(_frames()))
+        # Distinct mtimes so the oldest are the ones removed
+        time.sleep(0.01)
+
+    remaining = sorted(path for path in processor.frames_dir.iterdir() if path.is_dir())
+    assert remaining == sorted(job_dirs[-3:])
+    assert len(list(job_dirs[-1].iterdir())) == 2
+
+
+def test_expired_job_directories_are_removed(app_tmpdir, monkeypatch):
+    processor = VideoProcessor()
+    stale = processor._save_job_frames(_frames())
+    hour_ago = time.time() - settings.saved_frames_ttl_seconds - 60
+    os.utime(stale, (hour_ago, hour_ago))
+
+    fresh = processor._save_job_frames(_frames())
+
+    assert not stale.exists()
+    assert fresh.exists()
@@ -0,0 +1,122 @@
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from conftest import VIDEOS_DIR, requires_ffmpeg
+from services.video_processor import VideoProcessor, _split_jpeg_stream
+from utils.config import settings
+
+
+def _jpeg(value: int) -> bytes:
+    image = np.full((48, 64, 3), value, dtype=np.uint8)
+    cv2.putText(image, str(value), (5, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255 - value,) * 3, 2)
+    ok, encoded = cv2.imencode(".jpg", image)
+    assert ok
+    return encoded.tobytes()
+
+
+def _stream(processor: VideoProcessor, source: str, **kwargs):
+    async def collect():
+        stats = {}
+        frames = [frame async for frame in processor.stream_frames(source, stats=stats, **kwargs)]
+        return frames, stats
+    return asyncio.run(collect())
+
+
+@pytest.fixture
+def processor(app_tmpdir):
+    processor = VideoProcessor()
+    yield processor
+    processor.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 4096])
+def test_split_jpeg_stream_reassembles_frames_across_chunks(chunk_size):
+    images = [_jpeg(value) for value in (30, 120, 210)]
+    stream = b"".join(images)
+
+    found, buffer = [], b""
+    for start in range(0, len(stream), chunk_size):
+        buffer += stream[start:start + chunk_size]
+        complete, buffer = _split_jpeg_stream(buffer)
+        found.extend(complete)
+
+    assert found == images
+    assert buffer == b""
+
+
+def test_split_jpeg_stream_keeps_partial_image():
+    image = _jpeg(90)
+    complete, leftover = _split_jpeg_stream(image + image[:10])
+    assert complete == [image]
+    assert leftover == image[:10]
+
+
+@requires_ffmpeg
+def test_stream_frames_yields_planned_frame_count(processor, monkeypatch):
+    monkeypatch.setattr(settings, "max_frames_per_video", 5)
+    frames, stats = _stream(processor, str(VIDEOS_DIR / "cam-4.mp4"), deduplicate=False, frame_seconds=1.0)
+
+    assert stats["sampling_plan"]["frames_planned"] == 5
+    assert stats["sampling_plan"]["limited_by"] == "max_frames_per_video"
+    assert stats["frames_streamed"] == 5
+    assert [frame.index for frame in frames] == list(range(5))
+    assert not stats["deadline_reached"]
+    assert all(frame.decode() is not None for frame in frames)
+
+
+@requires_ffmpeg
+def test_stream_frames_stops_at_max_processing_time(processor, monkeypatch):
+    monkeypatch.setattr(settings, "max_processing_time", 0)
+    frames, stats = _stream(processor, str(VIDEOS_DIR / "cam-6.mp4"), deduplicate=False, frame_seconds=1.0)
+
+    assert stats["deadline_reached"]
+    assert frames == []
+
+
+@requires_ffmpeg
+def test_stream_frames_counts_skipped_duplicates(processor, app_tmpdir, monkeypatch):
+    # Two static scenes, 20 identical frames each, sampled at the clip's own frame rate
+    video_path = str(app_tmpdir / "two_scenes.mp4")
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (128, 96))
+    for scene in (40, 200):
+        image = np.full((96, 128, 3), scene, dtype=np.uint8)
+        cv2.rectangle(image, (20, 20), (60 if scene == 40 else 110, 70), (255 - scene,) * 3, -1)
+        for _ in range(20):
+            writer.write(image)
+    writer.release()
+    monkeypatch.setattr(settings, "frames_per_second", 10)
+
+    frames, stats = _stream(processor, video_path, deduplicate=True, frame_seconds=0.1)
+
+    assert stats["frames_streamed"] == stats["sampling_plan"]["frames_planned"] == 40
+    assert stats["duplicate_frames_skipped"] > 30
+    assert len(frames) + stats["duplicate_frames_skipped"] == stats["frames_streamed"]
+    assert [frame.index for frame in frames] == list(range(len(frames)))
+
+
+def test_stream_frames_kills_downloader_when_decoder_fails_to_start(processor, monkeypatch):
+    spawned = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def fake_exec(program, *args, **kwargs):
+        if program == "ffmpeg":
+            raise FileNotFoundError("ffmpeg")
+        # Stand in for yt-dlp with a process that would keep running
+        process = await create_subprocess_exec("sleep", "30", stdout=kwargs.get("stdout"))
+        spawned.append(process)
+        return process
+
+    async def no_duration(source, is_local):
+        return None
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+    monkeypatch.setattr(processor, "_probe_duration", no_duration)
+
+    with pytest.raises(FileNotFoundError):
+        _stream(processor, "https://example.com/watch?v=missing")
+
+    assert len(spawned) == 1
+    assert spawned[0].returncode is not None
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from conftest import VIDEOS_DIR
+from services.frame_buffer import FrameHandle
+from services.stream_ingestion import CameraStreamWorker, FrameRingBuffer, StreamIngestionManager
+from utils.config import settings
+
+
+def test_ring_buffer_drops_oldest_frames_when_full():
+    buffer = FrameRingBuffer(3)
+    for index in range(5):
+        buffer.push(FrameHandle.encode(np.full((2, 2), index, dtype=np.uint8), index), float(index))
+
+    assert len(buffer) == 3
+    assert buffer.dropped == 2
+    assert buffer.total == 5
+    assert [timestamp for timestamp, _ in buffer.snapshot()] == [2.0, 3.0, 4.0]
+    assert buffer.latest()[0] == 4.0
+
+
+async def _run_worker(camera_file: str, until, timeout: float = 30) -> CameraStreamWorker:
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        worker = CameraStreamWorker("cam-test", str(VIDEOS_DIR / camera_file), executor)
+        # Decode as fast as possible instead of pacing the file at its native frame rate
+        worker._is_local = False
+        worker.start()
+        deadline = time.monotonic() + timeout
+        try:
+            while not until(worker) and time.monotonic() < deadline:
+                assert len(worker.buffer) <= settings.stream_buffer_frames
+                await asyncio.sleep(0.01)
+        finally:
+            await worker.stop()
+    return worker
+
+
+@pytest.mark.parametrize("camera_file", ["cam-4.mp4", "cam-6.mp4"])
+def test_worker_keeps_a_bounded_buffer_and_reconnects_after_the_file_ends(camera_file, monkeypatch):
+    monkeypatch.setattr(settings, "stream_buffer_frames", 5)
+    monkeypatch.setattr(settings, "stream_reconnect_initial_seconds", 0.01)
+    monkeypatch.setattr(settings, "stream_reconnect_max_seconds", 0.05)
+
+    worker = asyncio.run(_run_worker(camera_file, lambda worker: worker.reconnects >= 2))
+    stats = worker.stats()
+
+    assert stats["reconnects"] >= 2
+    assert stats["last_error"] == "Stream ended"
+    assert stats["buffered_frames"] == 5
+    assert stats["frames_dropped"] > 0
+    assert stats["frames_received"] == stats["frames_dropped"] + stats["buffered_frames"]
+    assert 0.0 <= stats["motion_level"] <= 1.0
+
+    timestamp, frame = worker.buffer.latest()
+    assert isinstance(frame, FrameHandle)
+    assert max(frame.decode().shape[:2]) <= settings.stream_buffer_max_edge
+
+
+def test_worker_backs_off_when_the_stream_cannot_be_opened(monkeypatch):
+    monkeypatch.setattr(settings, "stream_reconnect_initial_seconds", 0.01)
+    monkeypatch.setattr(settings, "stream_reconnect_max_seconds", 0.05)
+
+    worker = asyncio.run(_run_worker("missing.mp4", lambda worker: worker.reconnects >= 3))
+
+    assert worker.reconnects >= 3
+    assert worker.buffer.total == 0
+    assert worker.last_error.startswith("Could not open stream")
+
+
+def test_cameras_beyond_max_workers_are_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "stream_max_workers", 1)
+    monkeypatch.setattr(settings, "stream_reconnect_initial_seconds", 0.01)
+
+    async def start_two():
+        manager = StreamIngestionManager()
+        try:
+            manager.start_camera("cam-a", str(VIDEOS_DIR / "missing.mp4"))
+            manager.start_camera("cam-b", str(VIDEOS_DIR / "missing.mp4"))
+            return {stats["camera_id"]: stats for stats in manager.stats()}
+        finally:
+            await manager.stop_all()
+
+    stats = asyncio.run(start_two())
+
+    assert stats["cam-a"]["status"] != "rejected"
+    assert stats["cam-b"]["status"] == "rejected"
+    assert "stream_max_workers=1" in stats["cam-b"]["last_error"]
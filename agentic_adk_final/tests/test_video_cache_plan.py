@@ -0,0 +1,81 @@
+import asyncio
+import os
+import shutil
+import uuid
+
+import pytest
+
+from conftest import VIDEOS_DIR
+from services.video_cache import VideoCache
+from services.video_processor import VideoProcessor
+from utils.config import settings
+
+VIDEO_URL = "https://www.youtube.com/watch?v=cam4"
+
+
+@pytest.fixture
+def processor(app_tmpdir, monkeypatch):
+    monkeypatch.setattr(settings, "video_cache_enabled", True)
+    monkeypatch.setattr(settings, "video_cache_dir", str(app_tmpdir / "cache"))
+    processor = VideoProcessor()
+    downloads = []
+
+    async def download(video_url):
+        # A local clip stands in for the yt-dlp download
+        path = str(app_tmpdir / f"video_{uuid.uuid4().hex}.mp4")
+        shutil.copy(VIDEOS_DIR / "cam-4.mp4", path)
+        downloads.append(video_url)
+        return path
+
+    monkeypatch.setattr(processor, "_download_video", download)
+    processor.downloads = downloads
+    yield processor
+    processor.close()
+
+
+def _process(processor, frame_seconds):
+    return asyncio.run(processor.process_youtube_video(VIDEO_URL, frame_seconds=frame_seconds))
+
+
+def test_cached_frames_are_reused_when_plan_is_unchanged(processor):
+    first = _process(processor, frame_seconds=1.0)
+    second = _process(processor, frame_seconds=1.0)
+
+    assert first["cache"] == "miss"
+    assert second["cache"] == "frames"
+    assert second["sampling_plan"] == first["sampling_plan"]
+    assert len(processor.downloads) == 1
+
+
+def test_cached_frames_are_replanned_when_latency_changes(processor):
+    full = _process(processor, frame_seconds=1.0)
+    # At 50 s per frame only 4 frames fit in the 300 s budget (one frame is held back for the summary)
+    slow = _process(processor, frame_seconds=50.0)
+    fast_again = _process(processor, frame_seconds=1.0)
+
+    assert slow["cache"] == "video"
+    assert slow["sampling_plan"]["frames_planned"] == 4
+    assert slow["sampling_plan"]["limited_by"] == "max_processing_time"
+    assert fast_again["cache"] == "video"
+    assert fast_again["sampling_plan"]["frames_planned"] == full["sampling_plan"]["frames_planned"]
+    assert len(processor.downloads) == 1
+
+
+def test_held_videos_are_not_evicted(app_tmpdir):
+    cache = VideoCache(cache_dir=str(app_tmpdir / "cache"), max_size_mb=0)
+    downloaded = app_tmpdir / "download.mp4"
+    shutil.copy(VIDEOS_DIR / "cam-4.mp4", downloaded)
+
+    held = cache.put_video(VIDEO_URL, str(downloaded))
+    also_held = cache.get_video(VIDEO_URL)
+    # Over the size limit, but both callers may still be decoding it
+    cache.evict()
+    assert os.path.exists(held)
+
+    cache.release(held)
+    cache.evict()
+    assert os.path.exists(also_held)
+
+    cache.release(also_held)
+    cache.evict()
+    assert not os.path.exists(held)
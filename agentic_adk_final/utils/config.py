@@ -1,4 +1,5 @@
 import os
+from typing import Dict, Optional
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv  # correct import for loading .env files
 
@@ -28,11 +29,85 @@ class Settings(BaseSettings):
     max_video_size_mb: int = 100
     frames_per_second: int = 1
     max_processing_time: int = 300  # 5 minutes
+    max_frames_per_video: int = 60
+    default_frame_analysis_seconds: float = 3.0  # used until real per-frame latency has been measured
+    frame_analysis_concurrency: int = 4  # Gemini frame calls in flight per analysis
+    frame_batch_size: int = 1  # frames packed into one Gemini request; 1 disables batching
+    frame_preprocess_enabled: bool = True
+    frame_max_edge: int = 1024  # long edge in pixels sent to Gemini; 0 keeps source resolution
+    frame_encode_format: str = "jpeg"  # jpeg or webp
+    frame_encode_quality: int = 80
+    summary_llm_min_risk: str = "MEDIUM"  # lower-risk runs get a local templated summary instead of a Gemini call
+    report_dir: str = "temp/reports"
+    report_render_workers: int = 2
+    report_render_timeout_seconds: int = 60
+    report_max_items: int = 100  # concerns/actions listed per report section
+    report_max_summary_chars: int = 20000
+    report_max_jobs: int = 200  # older finished reports are deleted beyond this
+    prefilter_enabled: bool = True
+    prefilter_threshold: float = 0.2  # frames scoring below this (0-1) are not sent to Gemini; see frame_prefilter for calibration
+    prefilter_use_hog: bool = False  # also count HOG people detections; slower
+    analysis_cache_enabled: bool = True
+    analysis_cache_path: str = "temp/analysis_cache.db"
+    analysis_cache_ttl_seconds: int = 86400  # 24 hours
+    analysis_cache_max_entries: int = 50000
+    analysis_cache_memory_entries: int = 1024
+    analysis_cache_evict_every: int = 100  # writes between expiry/size trims of the SQLite table
+    keyframe_dedup_enabled: bool = True
+    keyframe_hash_threshold: int = 6  # max dHash bit difference (of 256) treated as a duplicate frame
+    parallel_decode_min_seconds: int = 600  # clips at least this long are decoded in parallel segments
+    parallel_decode_workers: int = 0  # 0 uses os.cpu_count()
+    video_cache_enabled: bool = True
+    video_cache_dir: str = "temp/cache"
+    video_cache_max_size_mb: int = 2048
+    video_cache_ttl_seconds: int = 86400  # 24 hours
+    saved_frames_max_jobs: int = 50  # older save_frames job directories under temp/frames are deleted beyond this
+    saved_frames_ttl_seconds: int = 3600  # 1 hour
+    
+    # Gemini Rate Limits (shared by every model call in the process)
+    gemini_requests_per_second: float = 5.0
+    gemini_burst_requests: int = 5
+    gemini_tokens_per_minute: int = 1000000
+    
+    gemini_async_enabled: bool = True  # await generate_content_async where the SDK provides it
+    gemini_fallback_workers: int = 16  # threads for blocking generate_content calls otherwise
+    
+    # Local Gemini stand-in for benchmarks (no API key or network needed)
+    gemini_stub_enabled: bool = False
+    gemini_stub_latency_ms: float = 800  # median per call
+    gemini_stub_latency_sigma: float = 0.35  # log-normal spread; 0 gives a fixed latency
+    gemini_stub_latency_per_image_ms: float = 150
+    gemini_stub_error_rate: float = 0.0
+    gemini_stub_templates_path: str = ""  # JSON {"frame"|"summary"|"incident": [response texts]}
+    gemini_stub_seed: Optional[int] = None
+    
+    # Live Stream Ingestion
+    stream_ingestion_enabled: bool = False
+    camera_stream_urls: Dict[str, str] = {}  # camera id -> RTSP/RTMP URL or local file
+    stream_sample_fps: float = 2.0
+    stream_buffer_frames: int = 30
+    stream_buffer_max_edge: int = 640  # buffered frames are downscaled to this long edge and kept as JPEG
+    stream_buffer_jpeg_quality: int = 80
+    stream_max_workers: int = 64
+    stream_reconnect_initial_seconds: float = 1.0
+    stream_reconnect_max_seconds: float = 30.0
     
     # Emergency Settings
     emergency_response_timeout: int = 30  # seconds
     max_search_radius_km: int = 10
     
+    # Duplicate reports (same normalized location and type) share one analysis
+    incident_coalesce_enabled: bool = True
+    incident_coalesce_window_seconds: float = 300
+    incident_coalesce_max_keys: int = 1024
+    
+    # Background incident processing (POST /api/incidents/create?async_mode=true)
+    incident_queue_size: int = 500  # unfinished reports; further reports get 503 until some finish
+    
+    # Incident analysis capacity, shared by priority (weighted fair queueing with aging)
+    incident_analysis_max_concurrent: int = 4
+    incident_scheduler_aging_seconds: float = 30  # queue time worth one lowest-priority share
+    
     class Config:
         env_file = ".env"
         extra = "ignore"  # This allows extra fields to be ignored
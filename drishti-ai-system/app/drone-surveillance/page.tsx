@@ -19,6 +19,7 @@ export default function DroneSurveillance() {
   const [analysisComplete, setAnalysisComplete] = useState(false)
   const [detectedAnomalies, setDetectedAnomalies] = useState<any[]>([])
   const [summaryData, setSummaryData] = useState<any>(null)
+  const [reportUrl, setReportUrl] = useState<string | null>(null)
 
   const handleUpload = async () => {
     const input = document.createElement("input")
@@ -45,19 +46,21 @@ export default function DroneSurveillance() {
       formData.append("video_file", file)
 
       try {
-        const response = await axios.post("http://localhost:8000/api/drone/analyze", formData, {
+        // Frames stay in memory unless saved; "View frame" opens the saved files under /temp
+        const response = await axios.post("http://localhost:8000/api/drone/analyze?save_frames=true", formData, {
           headers: { "Content-Type": "multipart/form-data" }
         })
 
         clearInterval(progressInterval)
         setUploadProgress(100)
 
-        const { analysis, summary } = response.data
+        const { analysis, summary, report } = response.data
         setTimeout(() => {
           setIsProcessing(false)
           setAnalysisComplete(true)
           setDetectedAnomalies(analysis)
           setSummaryData(summary)
+          setReportUrl(report ? `http://localhost:8000${report.download_url}` : null)
         }, 1000)
 
       } catch (error) {
@@ -93,8 +96,8 @@ const handleViewFrame = (framePath: string) => {
     }
   }
 const handleDownloadReport = async () => {
-  const pdfUrl = "http://localhost:8000/temp/final_report.pdf";
-  const response = await fetch(pdfUrl);
+  if (!reportUrl) return;
+  const response = await fetch(reportUrl);
 
   if (!response.ok) {
     console.error("Failed to fetch PDF file.");